@@ -0,0 +1,37 @@
+"""Helpers for the on-disk cache shared by the database and the server.
+
+Downloaded copies of URL sources, index caches and fetched lyrics are all
+kept under ``default_cache_dir()``. Files there are written with
+``write_atomic``, so an interrupted write never leaves a truncated file.
+"""
+
+import os
+from pathlib import Path
+
+
+def default_cache_dir() -> Path:
+    """Directory for downloaded copies of URL sources and their index caches."""
+    override = os.environ.get('MUSIC_LIBRARY_MCP_CACHE_DIR')
+    if override:
+        return Path(override)
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'music-library-mcp'
+
+
+def write_atomic(path: Path, data: bytes) -> bool:
+    """Write data to path via a temporary file and rename.
+
+    Returns False (leaving any previous file in place) if writing fails.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return False
+    return True
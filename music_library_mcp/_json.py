@@ -0,0 +1,127 @@
+"""JSON helpers that use orjson when it is installed.
+
+orjson is an optional dependency (``pip install music-library-mcp[fast]``);
+without it the standard library json module is used. Both keep non-ASCII
+characters as is, and produce the same text for strings, booleans, None,
+integers within 64 bits, and lists and dicts of those (tests cover this
+subset). Other values may be written differently: floats in exponent form
+(orjson writes ``1e20``, json ``1e+20``), larger integers (which orjson
+rejects), and types only orjson serializes, such as datetimes. Don't rely
+on byte-identical output beyond that subset.
+
+Responses are read by MCP clients, not people, so ``dumps`` writes compact
+JSON. Set ``MUSIC_LIBRARY_MCP_DEBUG=1`` to get two-space indentation.
+``dumps_indented`` always indents, for JSON embedded in prompt texts.
+``dumps_sorted`` writes compact JSON with sorted keys, like Flask's jsonify.
+
+``load_json`` and ``write_songs_json`` read and write the songs files
+produced by the scripts in ``scripts/``.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import IO, Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+INDENT = bool(os.environ.get("MUSIC_LIBRARY_MCP_DEBUG"))
+
+if orjson is not None:
+    loads = orjson.loads
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if INDENT else 0)
+
+    def dumps(obj: Any) -> str:
+        """Serialize ``obj`` to a JSON string."""
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode()
+
+    def dumps_indented(obj: Any) -> str:
+        """Serialize ``obj`` to a JSON string with two-space indentation."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2).decode()
+
+    def dumps_sorted(obj: Any) -> str:
+        """Serialize ``obj`` to a compact JSON string with sorted keys."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS).decode()
+else:
+    loads = json.loads
+
+    def dumps(obj: Any) -> str:
+        """Serialize ``obj`` to a JSON string."""
+        if INDENT:
+            return json.dumps(obj, ensure_ascii=False, indent=2)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def dumps_indented(obj: Any) -> str:
+        """Serialize ``obj`` to a JSON string with two-space indentation."""
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+
+    def dumps_sorted(obj: Any) -> str:
+        """Serialize ``obj`` to a compact JSON string with sorted keys."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+# Arrays written as one-liners, matching the enriched file's formatting
+ONE_LINER_ARRAYS = frozenset({'composers', 'lyricists', 'translators', 'categoryIds'})
+
+# JSON string encoder used by json.dumps(ensure_ascii=False)
+encode_string = json.encoder.encode_basestring
+
+
+def format_value(value: Any, depth: int, one_liner: bool = False) -> str:
+    """Serialize a value nested ``depth`` levels deep in a songs file.
+
+    Formats like ``json.dumps`` with tab indentation, except that string
+    arrays under the ``ONE_LINER_ARRAYS`` keys are written on a single line.
+    """
+    if isinstance(value, str):
+        return encode_string(value)
+    if isinstance(value, dict):
+        if not value:
+            return "{}"
+        indent = "\n" + "\t" * (depth + 1)
+        items = [
+            indent + encode_string(key) + ": "
+            + format_value(item, depth + 1, key in ONE_LINER_ARRAYS)
+            for key, item in value.items()
+        ]
+        return "{" + ",".join(items) + "\n" + "\t" * depth + "}"
+    if isinstance(value, list):
+        if not value:
+            return "[]"
+        if one_liner and all(isinstance(item, str) for item in value):
+            return "[" + ", ".join(map(encode_string, value)) + "]"
+        indent = "\n" + "\t" * (depth + 1)
+        items = [indent + format_value(item, depth + 1) for item in value]
+        return "[" + ",".join(items) + "\n" + "\t" * depth + "]"
+    return json.dumps(value, ensure_ascii=False)
+
+
+def write_songs_json(data: dict, f: IO[str]) -> None:
+    """Write data in the enriched file's format (tabs, one-liner arrays).
+
+    Songs are serialized and written one at a time, so the whole document is
+    never held in memory as a single string.
+    """
+    if not data:
+        f.write("{}")
+        return
+
+    f.write("{")
+    for i, (key, value) in enumerate(data.items()):
+        f.write(("," if i else "") + "\n\t" + encode_string(key) + ": ")
+        if key == "songs" and isinstance(value, list) and value:
+            f.write("[")
+            for j, song in enumerate(value):
+                f.write(("," if j else "") + "\n\t\t" + format_value(song, 2))
+            f.write("\n\t]")
+        else:
+            f.write(format_value(value, 1))
+    f.write("\n}")
+
+
+def load_json(path: Union[str, Path]) -> Any:
+    """Load a JSON file, using orjson when it is installed."""
+    return loads(Path(path).read_bytes())
@@ -1,20 +1,68 @@
 """Core database layer for songs management and indexing."""
 
+import bisect
+import hashlib
 import json
+import os
+import pickle
+import sys
 from pathlib import Path
 from typing import Any, Union, Optional
-from collections import defaultdict
 import httpx
 
+from . import _json
+from ._cache import default_cache_dir, write_atomic
+
 
 class SongsDatabase:
     """Manages the songs database with efficient indexing for queries."""
 
-    def __init__(self, json_source: Union[str, Path]):
+    # HTTP client shared by every URL load, created on first use so the
+    # connection (and its TLS session) is reused across instances and reloads
+    _http_client: Optional[httpx.Client] = None
+
+    # Attributes filled by _load_data and _build_indexes, saved to the index
+    # cache. Cache files are keyed on this set and on the source of this
+    # module (see _index_cache_format), so changing either rebuilds them.
+    _INDEXED_ATTRIBUTES = (
+        'data', 'songs', 'categories',
+        'songs_by_id', 'songs_by_artist', 'songs_by_category', 'songs_by_composer',
+        'songs_by_lyricist', 'songs_by_translator', 'categories_by_id',
+        '_rows_by_artist', '_rows_by_category', '_rows_by_composer',
+        '_rows_by_lyricist', '_rows_by_translator',
+        '_name_lower', '_singer_lower', '_artist_col', '_composers_col', '_lyricists_col',
+        'artist_names', 'composer_names', 'lyricist_names', 'translator_names',
+        '_artists_listing', '_composers_listing', '_lyricists_listing', '_translators_listing',
+        '_artist_counts_sorted', '_composer_counts_sorted', '_lyricist_counts_sorted',
+        '_hebrew_cat_id', '_english_cat_id', '_collab_count',
+    )
+    # Indexes keyed by normalized names, re-interned after a cache load
+    _NAME_KEYED_ATTRIBUTES = (
+        'songs_by_artist', 'songs_by_composer', 'songs_by_lyricist', 'songs_by_translator',
+        '_rows_by_artist', '_rows_by_composer', '_rows_by_lyricist', '_rows_by_translator',
+        'artist_names', 'composer_names', 'lyricist_names', 'translator_names',
+    )
+    # Digest identifying the index cache format, computed on first use
+    _index_cache_format_digest: Optional[str] = None
+
+    def __init__(
+        self,
+        json_source: Union[str, Path],
+        *,
+        index_cache: bool = True
+    ):
         """Initialize the database from a JSON file or URL.
         
         Args:
             json_source: Either a local file path or a URL to fetch the JSON from
+            index_cache: Reuse the indexes saved in the cache directory
+                (``$MUSIC_LIBRARY_MCP_CACHE_DIR``, by default
+                ``~/.cache/music-library-mcp``) when they match the source
+                file's size and modification time and the current code, and
+                save them there after a fresh build. URL sources are
+                additionally kept as a local copy in that directory and
+                refreshed with a conditional GET, so an unchanged library is
+                neither downloaded nor re-indexed.
         """
         self.json_source = str(json_source)
         self.is_url = self.json_source.startswith('http://') or self.json_source.startswith('https://')
@@ -24,55 +72,353 @@ class SongsDatabase:
 
         # Indexes for efficient lookups
         self.songs_by_id: dict[int, dict[str, Any]] = {}
-        self.songs_by_artist: dict[str, list[dict[str, Any]]] = defaultdict(list)
-        self.songs_by_category: dict[str, list[dict[str, Any]]] = defaultdict(list)
-        self.songs_by_composer: dict[str, list[dict[str, Any]]] = defaultdict(list)
-        self.songs_by_lyricist: dict[str, list[dict[str, Any]]] = defaultdict(list)
-        self.songs_by_translator: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        self.songs_by_artist: dict[str, list[dict[str, Any]]] = {}
+        self.songs_by_category: dict[str, list[dict[str, Any]]] = {}
+        self.songs_by_composer: dict[str, list[dict[str, Any]]] = {}
+        self.songs_by_lyricist: dict[str, list[dict[str, Any]]] = {}
+        self.songs_by_translator: dict[str, list[dict[str, Any]]] = {}
         self.categories_by_id: dict[str, dict[str, Any]] = {}
+
+        # Row positions (indexes into self.songs) per index key, used by
+        # search_songs to combine filters with set intersections
+        self._rows_by_artist: dict[str, set[int]] = {}
+        self._rows_by_category: dict[str, set[int]] = {}
+        self._rows_by_composer: dict[str, set[int]] = {}
+        self._rows_by_lyricist: dict[str, set[int]] = {}
+        self._rows_by_translator: dict[str, set[int]] = {}
+
+        # Per-row columns aligned with self.songs, so scans read flat lists
+        # instead of every song dict. Lowercased names and singers serve query
+        # matching; stripped artists and non-empty contributor names serve
+        # the discovery aggregates.
+        self._name_lower: list[str] = []
+        self._singer_lower: list[str] = []
+        self._artist_col: list[str] = []
+        self._composers_col: list[tuple[str, ...]] = []
+        self._lyricists_col: list[tuple[str, ...]] = []
+        # Trigram -> rows whose lowercased name or singer contains it, built
+        # on the first search query long enough to use it
+        self._trigram_index: Optional[dict[str, set[int]]] = None
+
+        # Original display names per normalized key, recorded while indexing
+        self.artist_names: dict[str, str] = {}
+        self.composer_names: dict[str, str] = {}
+        self.lyricist_names: dict[str, str] = {}
+        self.translator_names: dict[str, str] = {}
         
-        # Collaboration cache: (lyricist_key, composer_key) -> collaboration data
-        self.collaborations_cache: dict[tuple[str, str], dict[str, Any]] = {}
+        # Collaboration cache: lyricist_key -> composer_key -> collaboration data
+        self.collaborations_cache: dict[str, dict[str, dict[str, Any]]] = {}
+        # The same entries keyed the other way round: composer_key -> lyricist_key
+        self.collabs_by_composer: dict[str, dict[str, dict[str, Any]]] = {}
+        # Number of distinct lyricist-composer pairs, counted while indexing so
+        # that get_stats does not need the collaboration indexes
+        self._collab_count = 0
+        # The collaboration indexes above are built lazily by _ensure_collab_cache
+        self._collab_built = False
+
+        # Sorted listings, computed once after indexing (the collaborations
+        # listing together with the collaborations cache). The data is read-only
+        # after load, so the get_all_* methods return these lists directly;
+        # callers must not modify them.
+        self._artists_listing: list[dict[str, Union[str, int]]] = []
+        self._composers_listing: list[dict[str, Union[str, int]]] = []
+        self._lyricists_listing: list[dict[str, Union[str, int]]] = []
+        self._translators_listing: list[dict[str, Union[str, int]]] = []
+        self._collaborations_listing: list[dict[str, Any]] = []
+        # Ascending song counts per contributor, used for fame ranks
+        self._artist_counts_sorted: list[int] = []
+        self._composer_counts_sorted: list[int] = []
+        self._lyricist_counts_sorted: list[int] = []
+        # Language category IDs for discovery, resolved while indexing
+        self._hebrew_cat_id: Optional[str] = None
+        self._english_cat_id: Optional[str] = None
+        # Discovery pools per language category id (None for all songs):
+        # unique artists, composers and lyricists, filled on first use
+        self._discovery_pools: dict[Optional[str], tuple[list[str], list[str], list[str]]] = {}
+        # Database statistics, computed on the first get_stats call
+        self._stats: Optional[dict[str, Any]] = None
+
+        # Local file the indexes are built from and whose state keys their
+        # cache: the source itself, or the downloaded copy of a URL source
+        self._local_path: Optional[Path] = None
+        raw: Optional[bytes] = None
+        if index_cache:
+            if self.is_url:
+                self._local_path, raw = self._fetch_conditionally()
+            else:
+                self._local_path = Path(self.json_source)
 
-        self._load_data()
+        # The cache key is taken before reading the file, so a file changed
+        # mid-load yields a cache that is rejected next time
+        cache_key = self._index_cache_key() if self._local_path is not None else None
+        if cache_key is not None and self._load_index_cache(cache_key):
+            return
+
+        if raw is None and self._local_path is not None:
+            raw = self._local_path.read_bytes()
+        self._load_data(raw)
         self._build_indexes()
+        if cache_key is not None:
+            self._save_index_cache(cache_key)
 
-    def _load_data(self) -> None:
-        """Load the JSON data from file or URL."""
-        if self.is_url:
-            # Fetch from URL
-            with httpx.Client() as client:
-                response = client.get(self.json_source, timeout=30.0)
-                response.raise_for_status()
-                self.data = response.json()
-        else:
-            # Load from local file
-            with open(self.json_source, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
+    def _load_data(self, raw: Optional[bytes] = None) -> None:
+        """Load the JSON data from file or URL, or from already-read bytes."""
+        # Both sources hand the raw bytes to a single parse call; the bytes
+        # go out of scope as soon as the document is built
+        if raw is None:
+            raw = self._read_source()
+        self.data = _json.loads(raw)
 
         self.songs = self.data.get('songs', [])
         self.categories = self.data.get('categories', [])
 
-    def _build_indexes(self) -> None:
-        """Build indexes for efficient querying."""
-        # Index songs by ID
+    def _read_source(self) -> bytes:
+        """Read the raw JSON bytes from file or URL."""
+        if self.is_url:
+            # Fetch from URL
+            response = self._get_http_client().get(self.json_source, timeout=30.0)
+            response.raise_for_status()
+            return response.content
+        # Load from local file
+        return Path(self.json_source).read_bytes()
+
+    def _fetch_conditionally(self) -> tuple[Optional[Path], Optional[bytes]]:
+        """Bring the local copy of the URL source up to date.
+
+        Sends the ETag / Last-Modified of the previous download, if any. On
+        304 Not Modified, returns the copy's path and no bytes. On 200, saves
+        the body and its validators and returns the path and the new bytes;
+        the path is None if the copy could not be written.
+        """
+        digest = hashlib.sha256(self.json_source.encode('utf-8')).hexdigest()[:16]
+        cache_dir = default_cache_dir()
+        body_path = cache_dir / f'{digest}.json'
+        meta_path = cache_dir / f'{digest}.meta.json'
+
+        headers = {}
+        if body_path.exists():
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                meta = {}
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = self._get_http_client().get(self.json_source, headers=headers, timeout=30.0)
+        if response.status_code == 304 and headers:
+            return body_path, None
+        response.raise_for_status()
+
+        raw = response.content
+        meta = {
+            'url': self.json_source,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        # Write the body before its validators, so validators never describe
+        # a body that failed to save
+        if not write_atomic(body_path, raw):
+            return None, raw
+        write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+        return body_path, raw
+
+    def _index_cache_path(self) -> Path:
+        """Path of the index cache file for the local JSON file.
+
+        The file lives in the cache directory, named after the JSON file's
+        absolute path, so nothing is written next to the user's data.
+        """
+        source = str(self._local_path.resolve())
+        digest = hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+        return default_cache_dir() / 'indexes' / f'{digest}.idx.pkl'
+
+    @classmethod
+    def _index_cache_format(cls) -> str:
+        """Digest of the indexed attribute names and of this module's source.
+
+        Any change to the indexing code or to _INDEXED_ATTRIBUTES yields a new
+        digest, so cache files written by other versions are never loaded.
+        """
+        if cls._index_cache_format_digest is None:
+            digest = hashlib.sha256(repr(cls._INDEXED_ATTRIBUTES).encode('utf-8'))
+            digest.update(Path(__file__).read_bytes())
+            cls._index_cache_format_digest = digest.hexdigest()
+        return cls._index_cache_format_digest
+
+    def _index_cache_key(self) -> tuple[str, int, int]:
+        """Identify the cache format and the current state of the local JSON file."""
+        stat = os.stat(self._local_path)
+        return (self._index_cache_format(), stat.st_mtime_ns, stat.st_size)
+
+    def _load_index_cache(self, cache_key: tuple[str, int, int]) -> bool:
+        """Restore the indexes from the cache file if it matches the source.
+
+        Returns False (leaving the instance untouched) when there is no cache,
+        it is stale, or it is unreadable or corrupt; the fresh build that
+        follows then overwrites it.
+        """
+        try:
+            with open(self._index_cache_path(), 'rb') as f:
+                # The key is pickled separately so a stale cache is rejected
+                # without unpickling the indexes
+                if pickle.load(f) != cache_key:
+                    return False
+                state = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError,
+                AttributeError, ImportError, LookupError, TypeError, ValueError):
+            # The errors unpickling a truncated or corrupt file can raise
+            return False
+        if not isinstance(state, dict) or not all(name in state for name in self._INDEXED_ATTRIBUTES):
+            return False
+
+        for name in self._INDEXED_ATTRIBUTES:
+            setattr(self, name, state[name])
+        self._reintern_names()
+        return True
+
+    def _reintern_names(self) -> None:
+        """Intern the names restored from the index cache.
+
+        Unpickled strings are new objects rather than the interned ones
+        _build_indexes stored, so intern them again: index keys then match
+        the keys _normalize_key returns by identity, and song names stay
+        shared with the indexes.
+        """
+        intern_names = self._intern_names
         for song in self.songs:
+            singer = song.get('singer')
+            if singer:
+                song['singer'] = sys.intern(singer)
+            intern_names(song, 'composers')
+            intern_names(song, 'lyricists')
+            intern_names(song, 'translators')
+        for name in self._NAME_KEYED_ATTRIBUTES:
+            index = getattr(self, name)
+            setattr(self, name, {sys.intern(key): value for key, value in index.items()})
+
+    def _save_index_cache(self, cache_key: tuple[str, int, int]) -> None:
+        """Write the indexes to the cache file; failures are ignored."""
+        state = {name: getattr(self, name) for name in self._INDEXED_ATTRIBUTES}
+        data = (
+            pickle.dumps(cache_key, protocol=pickle.HIGHEST_PROTOCOL)
+            + pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        write_atomic(self._index_cache_path(), data)
+
+    @classmethod
+    def _get_http_client(cls) -> httpx.Client:
+        """Return the shared HTTP client, creating it on first use.
+
+        HTTP/2 is enabled when the optional ``h2`` package is installed.
+        Compressed transfer (gzip/deflate, plus brotli if available) is
+        requested by httpx by default.
+        """
+        if cls._http_client is None:
+            try:
+                import h2  # noqa: F401
+                http2 = True
+            except ImportError:
+                http2 = False
+            cls._http_client = httpx.Client(http2=http2)
+        return cls._http_client
+
+    def _build_indexes(self) -> None:
+        """Build indexes for efficient querying in a single pass over the songs."""
+        # Bind the indexes to locals so the loop below skips attribute lookups
+        songs_by_id = self.songs_by_id
+        songs_by_artist = self.songs_by_artist
+        songs_by_category = self.songs_by_category
+        songs_by_composer = self.songs_by_composer
+        songs_by_lyricist = self.songs_by_lyricist
+        songs_by_translator = self.songs_by_translator
+        rows_by_artist = self._rows_by_artist
+        rows_by_category = self._rows_by_category
+        rows_by_composer = self._rows_by_composer
+        rows_by_lyricist = self._rows_by_lyricist
+        rows_by_translator = self._rows_by_translator
+        name_lower = self._name_lower
+        singer_lower = self._singer_lower
+        artist_col = self._artist_col
+        composers_col = self._composers_col
+        lyricists_col = self._lyricists_col
+        artist_names = self.artist_names
+        composer_names = self.composer_names
+        lyricist_names = self.lyricist_names
+        translator_names = self.translator_names
+        normalize_key = self._normalize_key
+        intern_names = self._intern_names
+        # Distinct (lyricist_key, composer_key) pairs, for the collaboration count
+        collab_pairs: set[tuple[str, str]] = set()
+
+        for row, song in enumerate(self.songs):
+            # Index songs by ID
             song_id = song.get('id')
             if song_id:
-                self.songs_by_id[song_id] = song
-
-        # Index songs by artist (normalized lowercase for matching)
-        for song in self.songs:
-            artist = song.get('singer', '').strip()
+                songs_by_id[song_id] = song
+
+            # Lowercase the searchable text once instead of on every query
+            singer = song.get('singer', '')
+            if singer:
+                # Share one string per distinct singer between songs and indexes
+                song['singer'] = singer = sys.intern(singer)
+            name_lower.append((song.get('name') or '').lower())
+            singer_lower.append((singer or '').lower())
+
+            # Index songs by artist (normalized lowercase for matching)
+            artist = singer.strip()
+            artist_col.append(artist)
             if artist:
-                artist_key = artist.lower()
-                self.songs_by_artist[artist_key].append(song)
+                artist_key = normalize_key(artist)
+                songs_by_artist.setdefault(artist_key, []).append(song)
+                rows_by_artist.setdefault(artist_key, set()).add(row)
+                artist_names.setdefault(artist_key, singer)
+
+            # Index songs by category
+            for cat_id in song.get('categoryIds', []):
+                songs_by_category.setdefault(cat_id, []).append(song)
+                rows_by_category.setdefault(cat_id, set()).add(row)
+
+            # Normalize each contributor name once
+            composers = [(c, normalize_key(c)) for c in intern_names(song, 'composers') if c]
+            lyricists = [(l, normalize_key(l)) for l in intern_names(song, 'lyricists') if l]
+            composers_col.append(tuple(composer for composer, _ in composers))
+            lyricists_col.append(tuple(lyricist for lyricist, _ in lyricists))
+
+            # Index songs by composer and lyricist
+            # Keep the first spelling seen as the display name, preferring one
+            # that differs from the normalized key (e.g. "Paul Simon" over "paul simon")
+            for composer, composer_key in composers:
+                songs_by_composer.setdefault(composer_key, []).append(song)
+                rows_by_composer.setdefault(composer_key, set()).add(row)
+                if composer_names.get(composer_key, composer_key) == composer_key:
+                    composer_names[composer_key] = composer
+            for lyricist, lyricist_key in lyricists:
+                songs_by_lyricist.setdefault(lyricist_key, []).append(song)
+                rows_by_lyricist.setdefault(lyricist_key, set()).add(row)
+                if lyricist_names.get(lyricist_key, lyricist_key) == lyricist_key:
+                    lyricist_names[lyricist_key] = lyricist
+
+            # Count collaborations the way _ensure_collab_cache builds them:
+            # songs with an ID and both lyricists and composers
+            if song_id and lyricists and composers:
+                collab_pairs.update(
+                    (lyricist_key, composer_key)
+                    for _, lyricist_key in lyricists
+                    for _, composer_key in composers
+                )
+
+            # Index songs by translator
+            for translator in intern_names(song, 'translators'):
+                if translator:
+                    translator_key = normalize_key(translator)
+                    songs_by_translator.setdefault(translator_key, []).append(song)
+                    rows_by_translator.setdefault(translator_key, set()).add(row)
+                    if translator_names.get(translator_key, translator_key) == translator_key:
+                        translator_names[translator_key] = translator
 
-        # Index songs by category
-        for song in self.songs:
-            category_ids = song.get('categoryIds', [])
-            for cat_id in category_ids:
-                self.songs_by_category[cat_id].append(song)
+        self._collab_count = len(collab_pairs)
 
         # Index categories by ID
         for category in self.categories:
@@ -80,69 +426,96 @@ class SongsDatabase:
             if cat_id:
                 self.categories_by_id[cat_id] = category
 
-        # Index songs by composer
-        for song in self.songs:
-            composers = song.get('composers', [])
-            for composer in composers:
-                if composer:
-                    composer_key = composer.lower().strip()
-                    self.songs_by_composer[composer_key].append(song)
+        # Categories used by the discovery language filter
+        self._hebrew_cat_id = self._find_category_id(['עברית', 'hebrew'])
+        self._english_cat_id = self._find_category_id(['english', 'אנגלית'])
 
-        # Index songs by lyricist
-        for song in self.songs:
-            lyricists = song.get('lyricists', [])
-            for lyricist in lyricists:
-                if lyricist:
-                    lyricist_key = lyricist.lower().strip()
-                    self.songs_by_lyricist[lyricist_key].append(song)
+        # Precompute the sorted listings
+        self._artists_listing = self._list_contributors(self.songs_by_artist, self.artist_names)
+        self._composers_listing = self._list_contributors(self.songs_by_composer, self.composer_names)
+        self._lyricists_listing = self._list_contributors(self.songs_by_lyricist, self.lyricist_names)
+        self._translators_listing = self._list_contributors(self.songs_by_translator, self.translator_names)
 
-        # Index songs by translator
-        for song in self.songs:
-            translators = song.get('translators', [])
-            for translator in translators:
-                if translator:
-                    translator_key = translator.lower().strip()
-                    self.songs_by_translator[translator_key].append(song)
+        # Ascending song counts per contributor, for fame rank lookups
+        self._artist_counts_sorted = sorted(len(songs) for songs in self.songs_by_artist.values())
+        self._composer_counts_sorted = sorted(len(songs) for songs in self.songs_by_composer.values())
+        self._lyricist_counts_sorted = sorted(len(songs) for songs in self.songs_by_lyricist.values())
 
-        # Build collaborations cache (lyricist × composer pairs)
-        for song in self.songs:
+    def _ensure_collab_cache(self) -> None:
+        """Build the collaborations cache on first use.
+
+        The lyricist × composer product is the most expensive index and is
+        only needed by the collaboration queries, so it is not built at load.
+        """
+        if self._collab_built:
+            return
+
+        collaborations_cache = self.collaborations_cache
+        collabs_by_composer = self.collabs_by_composer
+        normalize_key = self._normalize_key
+
+        # Song IDs already recorded per collaboration, for O(1) de-duplication
+        # while building (a name repeated in a song's credits yields the pair twice).
+        # Nested like the cache: lyricist_key -> composer_key -> song IDs.
+        collab_song_ids: dict[str, dict[str, set[int]]] = {}
+
+        for song, song_composers, song_lyricists in zip(self.songs, self._composers_col, self._lyricists_col):
             song_id = song.get('id')
-            if not song_id:
-                continue
-                
-            lyricists = song.get('lyricists', [])
-            composers = song.get('composers', [])
-            
-            # Skip songs without both lyricist and composer
-            if not lyricists or not composers:
+
+            # Build collaborations cache (lyricist × composer pairs).
+            # Skip songs without an ID or without both lyricist and composer.
+            if not song_id or not song_lyricists or not song_composers:
                 continue
-            
+
+            lyricists = [(l, normalize_key(l)) for l in song_lyricists]
+            composers = [(c, normalize_key(c)) for c in song_composers]
+
             # Create cartesian product of lyricists × composers
-            for lyricist in lyricists:
-                if not lyricist:
-                    continue
-                lyricist_key = lyricist.lower().strip()
-                
-                for composer in composers:
-                    if not composer:
-                        continue
-                    composer_key = composer.lower().strip()
-                    
-                    # Use tuple as key (lyricist, composer)
-                    collab_key = (lyricist_key, composer_key)
-                    
-                    if collab_key not in self.collaborations_cache:
-                        self.collaborations_cache[collab_key] = {
+            for lyricist, lyricist_key in lyricists:
+                lyricist_collabs = collaborations_cache.get(lyricist_key)
+                if lyricist_collabs is None:
+                    lyricist_collabs = collaborations_cache[lyricist_key] = {}
+                    lyricist_song_ids = collab_song_ids[lyricist_key] = {}
+                else:
+                    lyricist_song_ids = collab_song_ids[lyricist_key]
+
+                for composer, composer_key in composers:
+                    collab = lyricist_collabs.get(composer_key)
+                    if collab is None:
+                        collab = {
                             'lyricist': lyricist,
                             'composer': composer,
                             'song_ids': [],
-                            'song_count': 0
+                            'song_count': 0,
+                            'is_self_collab': lyricist_key == composer_key
                         }
-                    
+                        lyricist_collabs[composer_key] = collab
+                        collabs_by_composer.setdefault(composer_key, {})[lyricist_key] = collab
+                        lyricist_song_ids[composer_key] = set()
+
                     # Add song ID if not already present
-                    if song_id not in self.collaborations_cache[collab_key]['song_ids']:
-                        self.collaborations_cache[collab_key]['song_ids'].append(song_id)
-                        self.collaborations_cache[collab_key]['song_count'] += 1
+                    seen_ids = lyricist_song_ids[composer_key]
+                    if song_id not in seen_ids:
+                        seen_ids.add(song_id)
+                        collab['song_ids'].append(song_id)
+                        collab['song_count'] += 1
+
+        collaborations = [
+            self._format_collaboration(data)
+            for lyricist_collabs in collaborations_cache.values()
+            for data in lyricist_collabs.values()
+        ]
+        # Sort by song count (descending), then by lyricist name, then by composer name
+        collaborations.sort(key=lambda x: (-x['song_count'], x['lyricist'], x['composer']))
+        self._collaborations_listing = collaborations
+        self._collab_built = True
+
+    def _find_category_id(self, names: list[str]) -> Optional[str]:
+        """Return the ID of the first category whose lowercased name is in names."""
+        for cat in self.categories:
+            if cat.get('name', '').lower() in names:
+                return cat.get('id')
+        return None
 
     def get_song_by_id(self, song_id: int) -> Optional[dict[str, Any]]:
         """Get a song by its ID."""
@@ -150,7 +523,7 @@ class SongsDatabase:
 
     def get_songs_by_artist(self, artist_name: str) -> list[dict[str, Any]]:
         """Get all songs by an artist (case-insensitive)."""
-        artist_key = artist_name.lower().strip()
+        artist_key = self._normalize_key(artist_name)
         return self.songs_by_artist.get(artist_key, [])
 
     def get_songs_by_category(self, category_id: str) -> list[dict[str, Any]]:
@@ -173,132 +546,96 @@ class SongsDatabase:
 
     def get_all_artists(self) -> list[dict[str, Union[str, int]]]:
         """Get all unique artists with song counts."""
-        artists = []
-        for artist_key, songs in self.songs_by_artist.items():
-            # Get the original artist name from the first song
-            original_name = songs[0].get('singer', artist_key)
-            artists.append({
-                'name': original_name,
-                'song_count': len(songs)
-            })
-
-        # Sort by name
-        artists.sort(key=lambda x: x['name'])
-        return artists
+        return self._artists_listing
 
     def get_songs_by_composer(self, composer_name: str) -> list[dict[str, Any]]:
         """Get all songs by a composer (case-insensitive)."""
-        composer_key = composer_name.lower().strip()
+        composer_key = self._normalize_key(composer_name)
         return self.songs_by_composer.get(composer_key, [])
 
     def get_songs_by_lyricist(self, lyricist_name: str) -> list[dict[str, Any]]:
         """Get all songs by a lyricist (case-insensitive)."""
-        lyricist_key = lyricist_name.lower().strip()
+        lyricist_key = self._normalize_key(lyricist_name)
         return self.songs_by_lyricist.get(lyricist_key, [])
 
     def get_songs_by_translator(self, translator_name: str) -> list[dict[str, Any]]:
         """Get all songs by a translator (case-insensitive)."""
-        translator_key = translator_name.lower().strip()
+        translator_key = self._normalize_key(translator_name)
         return self.songs_by_translator.get(translator_key, [])
 
     def get_all_composers(self) -> list[dict[str, Union[str, int]]]:
         """Get all unique composers with song counts."""
-        composers = []
-        for composer_key, songs in self.songs_by_composer.items():
-            # Get the original composer name by finding it in the first song's composers array
-            original_name = composer_key
-            for song in songs:
-                composers_list = song.get('composers', [])
-                for composer in composers_list:
-                    if composer.lower().strip() == composer_key:
-                        original_name = composer
-                        break
-                if original_name != composer_key:
-                    break
-            
-            composers.append({
-                'name': original_name,
-                'song_count': len(songs)
-            })
-
-        # Sort by name
-        composers.sort(key=lambda x: x['name'])
-        return composers
+        return self._composers_listing
 
     def get_all_lyricists(self) -> list[dict[str, Union[str, int]]]:
         """Get all unique lyricists with song counts."""
-        lyricists = []
-        for lyricist_key, songs in self.songs_by_lyricist.items():
-            # Get the original lyricist name by finding it in the first song's lyricists array
-            original_name = lyricist_key
-            for song in songs:
-                lyricists_list = song.get('lyricists', [])
-                for lyricist in lyricists_list:
-                    if lyricist.lower().strip() == lyricist_key:
-                        original_name = lyricist
-                        break
-                if original_name != lyricist_key:
-                    break
-            
-            lyricists.append({
-                'name': original_name,
-                'song_count': len(songs)
-            })
-
-        # Sort by name
-        lyricists.sort(key=lambda x: x['name'])
-        return lyricists
+        return self._lyricists_listing
 
     def get_all_translators(self) -> list[dict[str, Union[str, int]]]:
         """Get all unique translators with song counts."""
-        translators = []
-        for translator_key, songs in self.songs_by_translator.items():
-            # Get the original translator name by finding it in the first song's translators array
-            original_name = translator_key
-            for song in songs:
-                translators_list = song.get('translators', [])
-                for translator in translators_list:
-                    if translator.lower().strip() == translator_key:
-                        original_name = translator
-                        break
-                if original_name != translator_key:
-                    break
-            
-            translators.append({
-                'name': original_name,
-                'song_count': len(songs)
-            })
+        return self._translators_listing
+
+    @staticmethod
+    def _normalize_key(name: str) -> str:
+        """Normalize a name into its index key.
+
+        Keys are interned so that repeated names share one string object and
+        dict lookups on them can short-circuit on identity.
+        """
+        return sys.intern(name.lower().strip())
+
+    @staticmethod
+    def _intern_names(song: dict[str, Any], field: str) -> list[str]:
+        """Intern the names listed in song[field] in place and return the list.
+
+        A name credited on many songs then occupies a single string object,
+        shared by every song dict and the display names kept in the indexes.
+        """
+        names = song.get(field)
+        if not names:
+            return []
+        names[:] = [sys.intern(name) if name else name for name in names]
+        return names
+
+    @staticmethod
+    def _list_contributors(
+        songs_by_key: dict[str, list[dict[str, Any]]],
+        names: dict[str, str]
+    ) -> list[dict[str, Union[str, int]]]:
+        """Build a name-sorted listing of an index, using the recorded original names."""
+        contributors = [
+            {'name': names[key], 'song_count': len(songs)}
+            for key, songs in songs_by_key.items()
+        ]
 
         # Sort by name
-        translators.sort(key=lambda x: x['name'])
-        return translators
-
-    def get_all_collaborations(self, limit: Optional[int] = None) -> list[dict[str, Any]]:
-        """Get all lyricist-composer collaborations sorted by song count."""
-        collaborations = []
-        for (lyricist_key, composer_key), data in self.collaborations_cache.items():
-            collaborations.append({
-                'lyricist': data['lyricist'],
-                'composer': data['composer'],
-                'song_count': data['song_count'],
-                'song_ids': data['song_ids']
-            })
-        
-        # Sort by song count (descending), then by lyricist name, then by composer name
-        collaborations.sort(key=lambda x: (-x['song_count'], x['lyricist'], x['composer']))
-        
+        contributors.sort(key=lambda x: x['name'])
+        return contributors
+
+    def get_all_collaborations(self, limit: Optional[int] = None, min_songs: int = 1) -> list[dict[str, Any]]:
+        """Get all lyricist-composer collaborations sorted by song count.
+
+        Only collaborations with at least min_songs songs are returned, at
+        most limit of them (all if limit is None or 0).
+        """
+        self._ensure_collab_cache()
+        listing = self._collaborations_listing
+        if min_songs > 1:
+            # The listing is sorted by descending song count, so the matches
+            # are a prefix of it
+            listing = listing[:bisect.bisect_right(listing, -min_songs, key=lambda x: -x['song_count'])]
         if limit:
-            return collaborations[:limit]
-        return collaborations
+            return listing[:limit]
+        return listing
 
     def get_collaboration_songs(self, lyricist: str, composer: str) -> Optional[dict[str, Any]]:
         """Get collaboration data for a specific lyricist-composer pair."""
-        lyricist_key = lyricist.lower().strip()
-        composer_key = composer.lower().strip()
-        collab_key = (lyricist_key, composer_key)
+        self._ensure_collab_cache()
+        lyricist_key = self._normalize_key(lyricist)
+        composer_key = self._normalize_key(composer)
+        data = self.collaborations_cache.get(lyricist_key, {}).get(composer_key)
         
-        if collab_key in self.collaborations_cache:
-            data = self.collaborations_cache[collab_key]
+        if data is not None:
             # Return full song objects, not just IDs
             songs = [self.songs_by_id[sid] for sid in data['song_ids'] if sid in self.songs_by_id]
             return {
@@ -306,46 +643,93 @@ class SongsDatabase:
                 'composer': data['composer'],
                 'song_count': data['song_count'],
                 'song_ids': data['song_ids'],
+                'is_self_collab': data['is_self_collab'],
                 'songs': songs
             }
         return None
 
-    def get_collaborations_by_lyricist(self, lyricist: str) -> list[dict[str, Any]]:
-        """Get all composers who collaborated with a specific lyricist."""
-        lyricist_key = lyricist.lower().strip()
-        collaborations = []
-        
-        for (lyr_key, comp_key), data in self.collaborations_cache.items():
-            if lyr_key == lyricist_key:
-                collaborations.append({
-                    'lyricist': data['lyricist'],
-                    'composer': data['composer'],
-                    'song_count': data['song_count'],
-                    'song_ids': data['song_ids']
-                })
-        
+    def get_collaborations_by_lyricist(
+        self, lyricist: str, limit: Optional[int] = None, min_songs: int = 1
+    ) -> list[dict[str, Any]]:
+        """Get all composers who collaborated with a specific lyricist.
+
+        Only collaborations with at least min_songs songs are returned, at
+        most limit of them (all if limit is None or 0).
+        """
+        self._ensure_collab_cache()
+        lyricist_key = self._normalize_key(lyricist)
+        collaborations = [
+            self._format_collaboration(data)
+            for data in self.collaborations_cache.get(lyricist_key, {}).values()
+            if data['song_count'] >= min_songs
+        ]
+
         # Sort by song count (descending)
         collaborations.sort(key=lambda x: -x['song_count'])
+        if limit:
+            del collaborations[limit:]
         return collaborations
 
-    def get_collaborations_by_composer(self, composer: str) -> list[dict[str, Any]]:
-        """Get all lyricists who collaborated with a specific composer."""
-        composer_key = composer.lower().strip()
-        collaborations = []
-        
-        for (lyr_key, comp_key), data in self.collaborations_cache.items():
-            if comp_key == composer_key:
-                collaborations.append({
-                    'lyricist': data['lyricist'],
-                    'composer': data['composer'],
-                    'song_count': data['song_count'],
-                    'song_ids': data['song_ids']
-                })
-        
+    def get_collaborations_by_composer(
+        self, composer: str, limit: Optional[int] = None, min_songs: int = 1
+    ) -> list[dict[str, Any]]:
+        """Get all lyricists who collaborated with a specific composer.
+
+        Only collaborations with at least min_songs songs are returned, at
+        most limit of them (all if limit is None or 0).
+        """
+        self._ensure_collab_cache()
+        composer_key = self._normalize_key(composer)
+        collaborations = [
+            self._format_collaboration(data)
+            for data in self.collabs_by_composer.get(composer_key, {}).values()
+            if data['song_count'] >= min_songs
+        ]
+
         # Sort by song count (descending)
         collaborations.sort(key=lambda x: -x['song_count'])
+        if limit:
+            del collaborations[limit:]
         return collaborations
 
+    @staticmethod
+    def _format_collaboration(data: dict[str, Any]) -> dict[str, Any]:
+        """Shape a collaboration cache entry for API responses."""
+        return {
+            'lyricist': data['lyricist'],
+            'composer': data['composer'],
+            'song_count': data['song_count'],
+            'song_ids': data['song_ids'],
+            'is_self_collab': data['is_self_collab']
+        }
+
+    def _rows_matching_trigrams(self, query_lower: str) -> Optional[set[int]]:
+        """Rows whose lowercased name or singer contains every trigram of the query.
+
+        The trigram index is built on the first call. Returns None for
+        queries shorter than three characters, which must be scanned.
+        """
+        if len(query_lower) < 3:
+            return None
+
+        if self._trigram_index is None:
+            trigram_index: dict[str, set[int]] = {}
+            for row, (name, singer) in enumerate(zip(self._name_lower, self._singer_lower)):
+                for text in (name, singer):
+                    for i in range(len(text) - 2):
+                        trigram_index.setdefault(text[i:i + 3], set()).add(row)
+            self._trigram_index = trigram_index
+
+        postings = []
+        for trigram in {query_lower[i:i + 3] for i in range(len(query_lower) - 2)}:
+            rows = self._trigram_index.get(trigram)
+            if rows is None:
+                return set()
+            postings.append(rows)
+
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
     def search_songs(
         self,
         query: Optional[str] = None,
@@ -356,58 +740,72 @@ class SongsDatabase:
         translator: Optional[str] = None
     ) -> list[dict[str, Any]]:
         """Search songs with multiple criteria."""
-        results = self.songs.copy()
-
-        # Filter by artist if specified
+        # Collect the row set of every structured filter that was given
+        row_sets = []
         if artist:
-            artist_songs = self.get_songs_by_artist(artist)
-            artist_ids = {s['id'] for s in artist_songs}
-            results = [s for s in results if s['id'] in artist_ids]
-
-        # Filter by category if specified
+            row_sets.append(self._rows_by_artist.get(self._normalize_key(artist), set()))
         if category_id:
-            category_songs = self.get_songs_by_category(category_id)
-            category_ids = {s['id'] for s in category_songs}
-            results = [s for s in results if s['id'] in category_ids]
-
-        # Filter by composer if specified
+            row_sets.append(self._rows_by_category.get(category_id, set()))
         if composer:
-            composer_songs = self.get_songs_by_composer(composer)
-            composer_ids = {s['id'] for s in composer_songs}
-            results = [s for s in results if s['id'] in composer_ids]
-
-        # Filter by lyricist if specified
+            row_sets.append(self._rows_by_composer.get(self._normalize_key(composer), set()))
         if lyricist:
-            lyricist_songs = self.get_songs_by_lyricist(lyricist)
-            lyricist_ids = {s['id'] for s in lyricist_songs}
-            results = [s for s in results if s['id'] in lyricist_ids]
-
-        # Filter by translator if specified
+            row_sets.append(self._rows_by_lyricist.get(self._normalize_key(lyricist), set()))
         if translator:
-            translator_songs = self.get_songs_by_translator(translator)
-            translator_ids = {s['id'] for s in translator_songs}
-            results = [s for s in results if s['id'] in translator_ids]
+            row_sets.append(self._rows_by_translator.get(self._normalize_key(translator), set()))
 
-        # Filter by name query (case-insensitive partial match)
+        # Narrow name queries through the trigram index; the substring test
+        # below still confirms every candidate
         if query:
             query_lower = query.lower()
-            results = [
-                s for s in results
-                if query_lower in s.get('name', '').lower()
-                or query_lower in s.get('singer', '').lower()
+            trigram_rows = self._rows_matching_trigrams(query_lower)
+            if trigram_rows is not None:
+                row_sets.append(trigram_rows)
+
+        # Intersect starting from the smallest bucket, keeping library order
+        if row_sets:
+            row_sets.sort(key=len)
+            rows = row_sets[0]
+            for other in row_sets[1:]:
+                if not rows:
+                    return []
+                rows = rows.intersection(other)
+            candidates = sorted(rows)
+        elif not query:
+            # No criteria: hand back the library itself rather than a copy;
+            # like the get_all_* listings, callers must not modify it
+            return self.songs
+        else:
+            # Query-only searches scan the library without copying it first
+            candidates = range(len(self.songs))
+
+        # Filter by name query (case-insensitive partial match)
+        if query:
+            name_lower = self._name_lower
+            singer_lower = self._singer_lower
+            candidates = [
+                row for row in candidates
+                if query_lower in name_lower[row] or query_lower in singer_lower[row]
             ]
 
-        return results
+        songs = self.songs
+        return [songs[row] for row in candidates]
 
     def get_stats(self) -> dict[str, Any]:
-        """Get database statistics."""
-        return {
+        """Get database statistics.
+
+        The statistics are computed on the first call and the same dict is
+        returned afterwards; callers must not modify it.
+        """
+        if self._stats is not None:
+            return self._stats
+
+        self._stats = {
             'total_songs': len(self.songs),
             'total_artists': len(self.songs_by_artist),
             'total_composers': len(self.songs_by_composer),
             'total_lyricists': len(self.songs_by_lyricist),
             'total_translators': len(self.songs_by_translator),
-            'total_collaborations': len(self.collaborations_cache),
+            'total_collaborations': self._collab_count,
             'total_categories': len(self.categories),
             'version': self.data.get('version', 'unknown'),
             'title': self.data.get('title', 'unknown'),
@@ -420,17 +818,19 @@ class SongsDatabase:
                 for cat in self.categories
             ]
         }
+        return self._stats
 
     def _calculate_fame_rank(self, song_count: int, all_counts: list[int]) -> int:
         """Calculate fame rank (0-100) based on percentile.
         
         Higher rank = more famous. Rank of 100 = most prolific, 0 = least.
+        all_counts must be sorted in ascending order.
         """
         if not all_counts or song_count == 0:
             return 0
         
         # Count how many have fewer songs
-        fewer_count = sum(1 for count in all_counts if count < song_count)
+        fewer_count = bisect.bisect_left(all_counts, song_count)
         
         # Calculate percentile rank (0-100)
         rank = int((fewer_count / len(all_counts)) * 100)
@@ -453,67 +853,55 @@ class SongsDatabase:
         """
         import random
         
-        # Determine which songs to sample from based on language filter
+        # Determine which songs to sample from based on language filter;
+        # the language category IDs are resolved once at index time
+        filter_cat_id = None
         if language.lower() == "hebrew":
-            # Find Hebrew category ID by searching categories
-            hebrew_cat_id = None
-            for cat in self.categories:
-                if cat.get('name', '').lower() in ['עברית', 'hebrew']:
-                    hebrew_cat_id = cat.get('id')
-                    break
-            
-            if hebrew_cat_id:
-                filtered_songs = self.songs_by_category.get(hebrew_cat_id, [])
-            else:
-                filtered_songs = self.songs
-                
+            filter_cat_id = self._hebrew_cat_id
         elif language.lower() == "english":
-            # Find English category ID by searching categories
-            english_cat_id = None
-            for cat in self.categories:
-                if cat.get('name', '').lower() in ['english', 'אנגלית']:
-                    english_cat_id = cat.get('id')
-                    break
-            
-            if english_cat_id:
-                filtered_songs = self.songs_by_category.get(english_cat_id, [])
-            else:
-                filtered_songs = self.songs
+            filter_cat_id = self._english_cat_id
+
+        # filtered_rows holds the matching row positions for the column scan
+        if filter_cat_id:
+            filtered_songs = self.songs_by_category.get(filter_cat_id, [])
+            filtered_rows = self._rows_by_category.get(filter_cat_id, set())
         else:
-            # Both - use all songs
+            # Both, or no matching language category - use all songs
+            filter_cat_id = None
             filtered_songs = self.songs
+            filtered_rows = range(len(self.songs))
         
         # Sample random songs
         sample_size = min(count, len(filtered_songs))
         random_songs = random.sample(filtered_songs, sample_size) if sample_size > 0 else []
         
-        # Extract unique artists, composers, lyricists from filtered songs
-        artists_set = set()
-        composers_set = set()
-        lyricists_set = set()
-        
-        for song in filtered_songs:
-            artist = song.get('singer', '').strip()
-            if artist:
-                artists_set.add(artist)
-            
-            for composer in song.get('composers', []):
-                if composer:
-                    composers_set.add(composer)
-            
-            for lyricist in song.get('lyricists', []):
-                if lyricist:
-                    lyricists_set.add(lyricist)
+        # Unique artists, composers, lyricists of the filtered rows, collected
+        # once per language filter and reused by later calls
+        pools = self._discovery_pools.get(filter_cat_id)
+        if pools is None:
+            artist_col = self._artist_col
+            composers_col = self._composers_col
+            lyricists_col = self._lyricists_col
+            artists_set = {artist_col[row] for row in filtered_rows}
+            artists_set.discard('')
+            composers_set = set()
+            lyricists_set = set()
+            for row in filtered_rows:
+                composers_set.update(composers_col[row])
+                lyricists_set.update(lyricists_col[row])
+            pools = (list(artists_set), list(composers_set), list(lyricists_set))
+            self._discovery_pools[filter_cat_id] = pools
+        artists_pool, composers_pool, lyricists_pool = pools
         
-        # Sample from each set
-        artists_sample = random.sample(list(artists_set), min(count, len(artists_set))) if artists_set else []
-        composers_sample = random.sample(list(composers_set), min(count, len(composers_set))) if composers_set else []
-        lyricists_sample = random.sample(list(lyricists_set), min(count, len(lyricists_set))) if lyricists_set else []
+        # Sample from each pool
+        artists_sample = random.sample(artists_pool, min(count, len(artists_pool))) if artists_pool else []
+        composers_sample = random.sample(composers_pool, min(count, len(composers_pool))) if composers_pool else []
+        lyricists_sample = random.sample(lyricists_pool, min(count, len(lyricists_pool))) if lyricists_pool else []
         
-        # Get all song counts for rank calculation
-        all_artist_counts = [len(songs) for songs in self.songs_by_artist.values()]
-        all_composer_counts = [len(songs) for songs in self.songs_by_composer.values()]
-        all_lyricist_counts = [len(songs) for songs in self.songs_by_lyricist.values()]
+        # Get all song counts for rank calculation (sorted once at index time)
+        all_artist_counts = self._artist_counts_sorted
+        all_composer_counts = self._composer_counts_sorted
+        all_lyricist_counts = self._lyricist_counts_sorted
         
         # Build cache for contributor fame scores
         artist_fame_cache = {}
@@ -536,7 +924,7 @@ class SongsDatabase:
         # Calculate fame scores for composers
         composers_with_fame = []
         for composer in composers_sample:
-            composer_key = composer.lower().strip()
+            composer_key = self._normalize_key(composer)
             song_count = len(self.songs_by_composer.get(composer_key, []))
             fame_rank = self._calculate_fame_rank(song_count, all_composer_counts)
             composer_fame_cache[composer_key] = fame_rank
@@ -549,7 +937,7 @@ class SongsDatabase:
         # Calculate fame scores for lyricists
         lyricists_with_fame = []
         for lyricist in lyricists_sample:
-            lyricist_key = lyricist.lower().strip()
+            lyricist_key = self._normalize_key(lyricist)
             song_count = len(self.songs_by_lyricist.get(lyricist_key, []))
             fame_rank = self._calculate_fame_rank(song_count, all_lyricist_counts)
             lyricist_fame_cache[lyricist_key] = fame_rank
@@ -574,7 +962,7 @@ class SongsDatabase:
             composers = song.get('composers', [])
             composer_fames = []
             for composer in composers:
-                composer_key = composer.lower().strip()
+                composer_key = self._normalize_key(composer)
                 if composer_key not in composer_fame_cache:
                     song_count = len(self.songs_by_composer.get(composer_key, []))
                     composer_fame_cache[composer_key] = self._calculate_fame_rank(song_count, all_composer_counts)
@@ -585,7 +973,7 @@ class SongsDatabase:
             lyricists = song.get('lyricists', [])
             lyricist_fames = []
             for lyricist in lyricists:
-                lyricist_key = lyricist.lower().strip()
+                lyricist_key = self._normalize_key(lyricist)
                 if lyricist_key not in lyricist_fame_cache:
                     song_count = len(self.songs_by_lyricist.get(lyricist_key, []))
                     lyricist_fame_cache[lyricist_key] = self._calculate_fame_rank(song_count, all_lyricist_counts)
@@ -1,14 +1,17 @@
 """MCP server implementation for the Music Library."""
 
-import json
 import asyncio
+import time
+from itertools import chain
 from pathlib import Path
-from urllib.parse import urlparse
+from typing import Any, Callable, Optional
+from urllib.parse import quote, unquote, urlparse
 
 import httpx
 from mcp.server import Server
 from mcp.types import (
     Resource,
+    ResourceTemplate,
     Tool,
     TextContent,
     ImageContent,
@@ -19,6 +22,8 @@ from mcp.types import (
 )
 from mcp.server.stdio import stdio_server
 
+from . import _json
+from ._cache import default_cache_dir, write_atomic
 from .database import SongsDatabase
 
 
@@ -35,59 +40,164 @@ app = Server("music-library-mcp")
 # MCP RESOURCES - Expose queryable data endpoints
 # ============================================================================
 
+# Static resources, identical on every listing; built once at import
+_STATIC_RESOURCES: tuple[Resource, ...] = (
+    Resource(
+        uri="songs://schema",
+        name="Data Schema & Field Meanings",
+        description="Documentation explaining what each field in the song data represents. IMPORTANT: Read this first to understand field meanings, especially dateCreated/dateModified which are internal timestamps, NOT actual song creation dates.",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="songs://list",
+        name="All Songs",
+        description="Browse all songs in the library with pagination",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="songs://categories",
+        name="All Categories",
+        description="List all song categories",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="songs://artists",
+        name="All Artists",
+        description="List all artists with song counts",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="songs://composers",
+        name="All Composers",
+        description="List all composers with song counts",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="songs://lyricists",
+        name="All Lyricists",
+        description="List all lyricists with song counts",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="songs://collaborations",
+        name="All Collaborations",
+        description="List all lyricist-composer collaborations sorted by song count",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="songs://stats",
+        name="Library Statistics",
+        description="Get statistics about the music library",
+        mimeType="application/json",
+    ),
+)
+
+
+# Schema document served at songs://schema; static, so serialized once here
+_SCHEMA_DOC = {
+    "title": "Music Library Data Schema",
+    "description": "Field definitions and meanings for song data",
+    "important_notes": [
+        "⚠️ CRITICAL: dateCreated and dateModified are INTERNAL SYSTEM TIMESTAMPS for database management.",
+        "These fields DO NOT represent when the actual songs were created or released.",
+        "These timestamps relate to when entries were added/modified in the database system.",
+        "DO NOT use these fields to analyze song eras, release dates, or music history timelines."
+    ],
+    "song_fields": {
+        "id": {
+            "type": "integer",
+            "description": "Unique identifier for the song"
+        },
+        "name": {
+            "type": "string",
+            "description": "The song title"
+        },
+        "singer": {
+            "type": "string",
+            "description": "The performing artist or singer"
+        },
+        "composers": {
+            "type": "array of strings",
+            "description": "The person(s) who composed the music"
+        },
+        "lyricists": {
+            "type": "array of strings",
+            "description": "The person(s) who wrote the lyrics"
+        },
+        "categoryIds": {
+            "type": "array of strings",
+            "description": "IDs of categories this song belongs to (e.g., Hebrew, English, children's songs, etc.)"
+        },
+        "playback": {
+            "type": "object",
+            "description": "Playback information",
+            "fields": {
+                "youTubeVideoId": "The YouTube video ID for this song"
+            }
+        },
+        "lyrics": {
+            "type": "object",
+            "description": "Lyrics information",
+            "fields": {
+                "markupUrl": "URL to the lyrics text file",
+                "markupVersion": "Version of the markup format (optional)"
+            }
+        },
+        "dateCreated": {
+            "type": "timestamp (milliseconds)",
+            "description": "⚠️ INTERNAL USE ONLY: Database entry creation timestamp. NOT the song's actual creation/release date.",
+            "warning": "This is a system timestamp for when the entry was added to the database. It has nothing to do with when the song was actually written, recorded, or released."
+        },
+        "dateModified": {
+            "type": "timestamp (milliseconds)",
+            "description": "⚠️ INTERNAL USE ONLY: Database entry last modification timestamp. NOT when the song was modified.",
+            "warning": "This is a system timestamp for when the database entry was last updated. It has nothing to do with the song itself."
+        }
+    },
+    "usage_guidelines": {
+        "analyzing_music_history": "Do NOT use dateCreated/dateModified fields. These are database timestamps, not music metadata.",
+        "finding_new_songs": "Use the 'newSongIds' array in the root data structure, not dateCreated.",
+        "timeline_analysis": "Date fields in this database cannot be used for temporal analysis of music trends or eras.",
+        "collaborations": "Use composer/lyricist fields to analyze creative partnerships.",
+        "categorization": "Use categoryIds and the categories list for genre and theme analysis."
+    }
+}
+_SCHEMA_JSON = _json.dumps(_SCHEMA_DOC)
+
+
+# Full resource listing, cached per database instance. The library does not
+# change after load, so the listing only needs building once per database.
+_resources_cache: Optional[tuple[SongsDatabase, list[Resource]]] = None
+
+# Serialized payloads of the fixed resource paths (list, artists, stats, ...)
+# and of other responses that depend only on the library, cached per database
+# instance for the same reason. Keyed by resource path, or "<tool>/<args>".
+_payload_cache: tuple[Optional[SongsDatabase], dict[str, str]] = (None, {})
+
+
+def _cached_payload(key: str) -> Optional[str]:
+    """Return the cached payload for key, if any."""
+    owner, payloads = _payload_cache
+    return payloads.get(key) if owner is db else None
+
+
+def _store_payload(key: str, payload: str) -> str:
+    """Cache the payload for key and return it."""
+    global _payload_cache
+    if _payload_cache[0] is not db:
+        _payload_cache = (db, {})
+    _payload_cache[1][key] = payload
+    return payload
+
+
 @app.list_resources()
 async def list_resources() -> list[Resource]:
     """List all available resources."""
-    resources = [
-        Resource(
-            uri="songs://schema",
-            name="Data Schema & Field Meanings",
-            description="Documentation explaining what each field in the song data represents. IMPORTANT: Read this first to understand field meanings, especially dateCreated/dateModified which are internal timestamps, NOT actual song creation dates.",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="songs://list",
-            name="All Songs",
-            description="Browse all songs in the library with pagination",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="songs://categories",
-            name="All Categories",
-            description="List all song categories",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="songs://artists",
-            name="All Artists",
-            description="List all artists with song counts",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="songs://composers",
-            name="All Composers",
-            description="List all composers with song counts",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="songs://lyricists",
-            name="All Lyricists",
-            description="List all lyricists with song counts",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="songs://collaborations",
-            name="All Collaborations",
-            description="List all lyricist-composer collaborations sorted by song count",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="songs://stats",
-            name="Library Statistics",
-            description="Get statistics about the music library",
-            mimeType="application/json",
-        ),
-    ]
+    global _resources_cache
+    if _resources_cache is not None and _resources_cache[0] is db:
+        return list(_resources_cache[1])
+
+    resources = list(_STATIC_RESOURCES)
 
     # Add dynamic resources for top collaborations
     collaborations = db.get_all_collaborations(limit=10)  # Top 10 collaborations
@@ -97,7 +207,7 @@ async def list_resources() -> list[Resource]:
         count = collab['song_count']
         
         # Create descriptive name
-        if lyricist.lower().strip() == composer.lower().strip():
+        if collab['is_self_collab']:
             # Self-collaboration (same person as lyricist and composer)
             name = f"{lyricist} (self-collaboration)"
             description = f"{lyricist} wrote both lyrics and music for {count} songs"
@@ -107,187 +217,308 @@ async def list_resources() -> list[Resource]:
         
         resources.append(
             Resource(
-                uri=f"songs://collaboration/{lyricist}/{composer}",
+                uri=f"songs://collaboration/{quote(lyricist, safe='')}/{quote(composer, safe='')}",
                 name=name,
                 description=description,
                 mimeType="application/json",
             )
         )
 
-    return resources
+    _resources_cache = (db, resources)
+    return list(resources)
+
+
+# Parameterized resources, advertised once each instead of enumerating every
+# artist, composer, song, etc. as a concrete resource
+_RESOURCE_TEMPLATES: tuple[ResourceTemplate, ...] = (
+    ResourceTemplate(
+        uriTemplate="songs://song/{song_id}",
+        name="Song Details",
+        description="Get individual song details by song ID",
+        mimeType="application/json",
+    ),
+    ResourceTemplate(
+        uriTemplate="songs://artist/{name}",
+        name="Songs by Artist",
+        description="Get all songs by a specific artist",
+        mimeType="application/json",
+    ),
+    ResourceTemplate(
+        uriTemplate="songs://composer/{name}",
+        name="Songs by Composer",
+        description="Get all songs by a specific composer",
+        mimeType="application/json",
+    ),
+    ResourceTemplate(
+        uriTemplate="songs://lyricist/{name}",
+        name="Songs by Lyricist",
+        description="Get all songs by a specific lyricist",
+        mimeType="application/json",
+    ),
+    ResourceTemplate(
+        uriTemplate="songs://collaboration/{lyricist}/{composer}",
+        name="Collaboration Details",
+        description="Get the songs from a specific lyricist-composer partnership",
+        mimeType="application/json",
+    ),
+    ResourceTemplate(
+        uriTemplate="songs://category/{category_id}",
+        name="Songs in Category",
+        description="Get a category and all of its songs",
+        mimeType="application/json",
+    ),
+)
 
 
-@app.read_resource()
-async def read_resource(uri: str) -> str:
-    """Read a specific resource."""
-    parsed = urlparse(uri)
+@app.list_resource_templates()
+async def list_resource_templates() -> list[ResourceTemplate]:
+    """List the parameterized resources."""
+    return list(_RESOURCE_TEMPLATES)
 
-    if parsed.scheme != "songs":
-        raise ValueError(f"Unsupported URI scheme: {parsed.scheme}")
 
-    path = parsed.path.lstrip("/")
-
-    # Handle different resource paths
-    if path == "schema":
-        schema_doc = {
-            "title": "Music Library Data Schema",
-            "description": "Field definitions and meanings for song data",
-            "important_notes": [
-                "⚠️ CRITICAL: dateCreated and dateModified are INTERNAL SYSTEM TIMESTAMPS for database management.",
-                "These fields DO NOT represent when the actual songs were created or released.",
-                "These timestamps relate to when entries were added/modified in the database system.",
-                "DO NOT use these fields to analyze song eras, release dates, or music history timelines."
-            ],
-            "song_fields": {
-                "id": {
-                    "type": "integer",
-                    "description": "Unique identifier for the song"
-                },
-                "name": {
-                    "type": "string",
-                    "description": "The song title"
-                },
-                "singer": {
-                    "type": "string",
-                    "description": "The performing artist or singer"
-                },
-                "composers": {
-                    "type": "array of strings",
-                    "description": "The person(s) who composed the music"
-                },
-                "lyricists": {
-                    "type": "array of strings",
-                    "description": "The person(s) who wrote the lyrics"
-                },
-                "categoryIds": {
-                    "type": "array of strings",
-                    "description": "IDs of categories this song belongs to (e.g., Hebrew, English, children's songs, etc.)"
-                },
-                "playback": {
-                    "type": "object",
-                    "description": "Playback information",
-                    "fields": {
-                        "youTubeVideoId": "The YouTube video ID for this song"
-                    }
-                },
-                "lyrics": {
-                    "type": "object",
-                    "description": "Lyrics information",
-                    "fields": {
-                        "markupUrl": "URL to the lyrics text file",
-                        "markupVersion": "Version of the markup format (optional)"
-                    }
-                },
-                "dateCreated": {
-                    "type": "timestamp (milliseconds)",
-                    "description": "⚠️ INTERNAL USE ONLY: Database entry creation timestamp. NOT the song's actual creation/release date.",
-                    "warning": "This is a system timestamp for when the entry was added to the database. It has nothing to do with when the song was actually written, recorded, or released."
-                },
-                "dateModified": {
-                    "type": "timestamp (milliseconds)",
-                    "description": "⚠️ INTERNAL USE ONLY: Database entry last modification timestamp. NOT when the song was modified.",
-                    "warning": "This is a system timestamp for when the database entry was last updated. It has nothing to do with the song itself."
-                }
-            },
-            "usage_guidelines": {
-                "analyzing_music_history": "Do NOT use dateCreated/dateModified fields. These are database timestamps, not music metadata.",
-                "finding_new_songs": "Use the 'newSongIds' array in the root data structure, not dateCreated.",
-                "timeline_analysis": "Date fields in this database cannot be used for temporal analysis of music trends or eras.",
-                "collaborations": "Use composer/lyricist fields to analyze creative partnerships.",
-                "categorization": "Use categoryIds and the categories list for genre and theme analysis."
-            }
-        }
-        return json.dumps(schema_doc, ensure_ascii=False, indent=2)
+def _read_list() -> str:
+    return _json.dumps(db.get_all_songs(limit=100))
 
-    elif path == "list":
-        songs = db.get_all_songs(limit=100)
-        return json.dumps(songs, ensure_ascii=False, indent=2)
 
-    elif path == "categories":
-        categories = db.get_all_categories()
-        return json.dumps(categories, ensure_ascii=False, indent=2)
+def _read_categories() -> str:
+    return _json.dumps(db.get_all_categories())
 
-    elif path == "artists":
-        artists = db.get_all_artists()
-        return json.dumps(artists, ensure_ascii=False, indent=2)
 
-    elif path == "composers":
-        composers = db.get_all_composers()
-        return json.dumps(composers, ensure_ascii=False, indent=2)
+def _read_artists() -> str:
+    return _json.dumps(db.get_all_artists())
 
-    elif path == "lyricists":
-        lyricists = db.get_all_lyricists()
-        return json.dumps(lyricists, ensure_ascii=False, indent=2)
 
+def _read_composers() -> str:
+    return _json.dumps(db.get_all_composers())
 
-    elif path == "collaborations":
-        collaborations = db.get_all_collaborations(limit=100)
-        return json.dumps(collaborations, ensure_ascii=False, indent=2)
 
-    elif path == "stats":
-        stats = db.get_stats()
-        return json.dumps(stats, ensure_ascii=False, indent=2)
+def _read_lyricists() -> str:
+    return _json.dumps(db.get_all_lyricists())
 
-    elif path.startswith("song/"):
-        song_id = int(path.split("/")[1])
-        song = db.get_song_by_id(song_id)
-        if not song:
-            raise ValueError(f"Song not found: {song_id}")
-        return json.dumps(song, ensure_ascii=False, indent=2)
 
-    elif path.startswith("artist/"):
-        artist_name = path.split("/", 1)[1]
-        songs = db.get_songs_by_artist(artist_name)
-        if not songs:
-            raise ValueError(f"No songs found for artist: {artist_name}")
-        return json.dumps(songs, ensure_ascii=False, indent=2)
+def _read_collaborations() -> str:
+    return _json.dumps(db.get_all_collaborations(limit=100))
 
-    elif path.startswith("composer/"):
-        composer_name = path.split("/", 1)[1]
-        songs = db.get_songs_by_composer(composer_name)
-        if not songs:
-            raise ValueError(f"No songs found for composer: {composer_name}")
-        return json.dumps(songs, ensure_ascii=False, indent=2)
 
-    elif path.startswith("lyricist/"):
-        lyricist_name = path.split("/", 1)[1]
-        songs = db.get_songs_by_lyricist(lyricist_name)
-        if not songs:
-            raise ValueError(f"No songs found for lyricist: {lyricist_name}")
-        return json.dumps(songs, ensure_ascii=False, indent=2)
+def _read_stats() -> str:
+    return _json.dumps(db.get_stats())
 
 
-    elif path.startswith("collaboration/"):
-        # Parse lyricist/composer from path
-        parts = path.split("/", 2)
-        if len(parts) < 3:
-            raise ValueError("Invalid collaboration path format")
-        lyricist_name = parts[1]
-        composer_name = parts[2]
-        
-        collab_data = db.get_collaboration_songs(lyricist_name, composer_name)
-        if not collab_data:
-            raise ValueError(f"No collaboration found for {lyricist_name} and {composer_name}")
-        return json.dumps(collab_data, ensure_ascii=False, indent=2)
+def _read_song(tail: str) -> str:
+    song_id = int(unquote(tail.split("/")[0]))
+    song = db.get_song_by_id(song_id)
+    if not song:
+        raise ValueError(f"Song not found: {song_id}")
+    return _json.dumps(song)
 
-    elif path.startswith("category/"):
-        category_id = path.split("/")[1]
-        songs = db.get_songs_by_category(category_id)
-        category = db.get_category_by_id(category_id)
-        result = {
-            "category": category,
-            "songs": songs
-        }
-        return json.dumps(result, ensure_ascii=False, indent=2)
 
-    else:
+def _read_artist(tail: str) -> str:
+    artist_name = unquote(tail)
+    songs = db.get_songs_by_artist(artist_name)
+    if not songs:
+        raise ValueError(f"No songs found for artist: {artist_name}")
+    return _json.dumps(songs)
+
+
+def _read_composer(tail: str) -> str:
+    composer_name = unquote(tail)
+    songs = db.get_songs_by_composer(composer_name)
+    if not songs:
+        raise ValueError(f"No songs found for composer: {composer_name}")
+    return _json.dumps(songs)
+
+
+def _read_lyricist(tail: str) -> str:
+    lyricist_name = unquote(tail)
+    songs = db.get_songs_by_lyricist(lyricist_name)
+    if not songs:
+        raise ValueError(f"No songs found for lyricist: {lyricist_name}")
+    return _json.dumps(songs)
+
+
+def _read_collaboration(tail: str) -> str:
+    # Parse lyricist/composer from path; split before decoding, since a
+    # name may contain an encoded "/"
+    lyricist_name, sep, composer_name = tail.partition("/")
+    if not sep:
+        raise ValueError("Invalid collaboration path format")
+    lyricist_name = unquote(lyricist_name)
+    composer_name = unquote(composer_name)
+
+    collab_data = db.get_collaboration_songs(lyricist_name, composer_name)
+    if not collab_data:
+        raise ValueError(f"No collaboration found for {lyricist_name} and {composer_name}")
+    return _json.dumps(collab_data)
+
+
+def _read_category(tail: str) -> str:
+    category_id = unquote(tail.split("/")[0])
+    result = {
+        "category": db.get_category_by_id(category_id),
+        "songs": db.get_songs_by_category(category_id),
+    }
+    return _json.dumps(result)
+
+
+# Handlers for fixed resource paths; their payloads are cached
+_STATIC_HANDLERS: dict[str, Callable[[], str]] = {
+    "schema": lambda: _SCHEMA_JSON,
+    "list": _read_list,
+    "categories": _read_categories,
+    "artists": _read_artists,
+    "composers": _read_composers,
+    "lyricists": _read_lyricists,
+    "collaborations": _read_collaborations,
+    "stats": _read_stats,
+}
+
+# Handlers for "<kind>/<rest>" paths, called with the rest of the path still
+# percent-encoded; each handler decodes its own parameters
+_PREFIX_HANDLERS: dict[str, Callable[[str], str]] = {
+    "song": _read_song,
+    "artist": _read_artist,
+    "composer": _read_composer,
+    "lyricist": _read_lyricist,
+    "collaboration": _read_collaboration,
+    "category": _read_category,
+}
+
+
+@app.read_resource()
+async def read_resource(uri: str) -> str:
+    """Read a specific resource."""
+    parsed = urlparse(str(uri))
+
+    if parsed.scheme != "songs":
+        raise ValueError(f"Unsupported URI scheme: {parsed.scheme}")
+
+    # In songs://artists the first segment is parsed as the network location,
+    # in songs:///artists it is part of the path; accept both
+    path = (parsed.netloc + parsed.path).lstrip("/")
+
+    handler = _STATIC_HANDLERS.get(path)
+    if handler is not None:
+        payload = _cached_payload(path)
+        if payload is None:
+            payload = _store_payload(path, handler())
+        return payload
+
+    kind, sep, tail = path.partition("/")
+    prefix_handler = _PREFIX_HANDLERS.get(kind)
+    if prefix_handler is None or not sep:
         raise ValueError(f"Unknown resource path: {path}")
+    return prefix_handler(tail)
 
 
 # ============================================================================
 # MCP TOOLS - Operations for searching and data fetching
 # ============================================================================
 
+# HTTP client shared by tool calls, created on first use so connections (and
+# their TLS sessions) are kept alive between calls; closed when main() exits
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared async HTTP client, creating it on first use.
+
+    HTTP/2 is enabled when the optional ``h2`` package is installed.
+    """
+    global _http_client
+    if _http_client is None:
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        _http_client = httpx.AsyncClient(
+            http2=http2,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+    return _http_client
+
+
+# Lyrics fetched by get_lyrics are kept on disk, one JSON file per song, and
+# reused while the song's markup URL and version are unchanged and the copy
+# is younger than this many seconds
+_LYRICS_CACHE_TTL = 7 * 24 * 60 * 60
+
+
+def _lyrics_cache_path(song_id: int) -> Path:
+    """Path of the cached lyrics file for a song."""
+    return default_cache_dir() / "lyrics" / f"{song_id}.json"
+
+
+def _read_cached_lyrics(song_id: int, markup_url: str, markup_version: Any) -> Optional[str]:
+    """Return the cached lyrics text, or None if missing, stale or unreadable."""
+    try:
+        entry = _json.loads(_lyrics_cache_path(song_id).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if entry.get("url") != markup_url or entry.get("version") != markup_version:
+        return None
+    if time.time() - entry.get("fetched_at", 0) > _LYRICS_CACHE_TTL:
+        return None
+    return entry.get("text")
+
+
+def _write_cached_lyrics(song_id: int, markup_url: str, markup_version: Any, text: str) -> None:
+    """Save fetched lyrics to the cache; failures are ignored."""
+    entry = {
+        "url": markup_url,
+        "version": markup_version,
+        "fetched_at": int(time.time()),
+        "text": text,
+    }
+    write_atomic(_lyrics_cache_path(song_id), _json.dumps(entry).encode("utf-8"))
+
+
+# Lyrics downloads in progress, by song id, so that concurrent get_lyrics
+# calls for the same song share a single request
+_lyrics_inflight: dict[int, "asyncio.Task[str]"] = {}
+
+
+async def _download_lyrics(song_id: int, markup_url: str, markup_version: Any) -> str:
+    """Download lyrics and save them to the cache."""
+    response = await _get_http_client().get(markup_url)
+    response.raise_for_status()
+    lyrics_text = response.text
+    await asyncio.to_thread(_write_cached_lyrics, song_id, markup_url, markup_version, lyrics_text)
+    return lyrics_text
+
+
+def _forget_download(song_id: int, task: "asyncio.Task[str]") -> None:
+    """Drop a finished lyrics download from the in-flight table."""
+    _lyrics_inflight.pop(song_id, None)
+    # Every waiter may have been cancelled; retrieve the outcome so a failed
+    # download nobody awaits is not reported as "never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+async def _fetch_lyrics(song_id: int, markup_url: str, markup_version: Any) -> str:
+    """Return a song's lyrics from the cache, downloading them on a miss.
+
+    The cache file is read and written in a worker thread, so disk I/O does
+    not block the event loop.
+    """
+    task = _lyrics_inflight.get(song_id)
+    if task is None:
+        lyrics_text = await asyncio.to_thread(_read_cached_lyrics, song_id, markup_url, markup_version)
+        if lyrics_text is not None:
+            return lyrics_text
+        # Another call may have started the download while the cache was read
+        task = _lyrics_inflight.get(song_id)
+    if task is None:
+        task = asyncio.ensure_future(_download_lyrics(song_id, markup_url, markup_version))
+        _lyrics_inflight[song_id] = task
+        task.add_done_callback(lambda done: _forget_download(song_id, done))
+    # Shielded so that one caller being cancelled does not cancel the
+    # download for the others waiting on it
+    return await asyncio.shield(task)
+
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List all available tools."""
@@ -395,6 +626,10 @@ async def list_tools() -> list[Tool]:
     ]
 
 
+# Notice attached to every search_songs response
+_SEARCH_NOTE = "⚠️ IMPORTANT: dateCreated and dateModified are internal database timestamps, NOT actual song creation dates. See the schema resource (songs://schema) for complete field documentation."
+
+
 @app.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     """Handle tool calls."""
@@ -416,7 +651,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 
         # Wrap results with metadata note
         response_data = {
-            "_note": "⚠️ IMPORTANT: dateCreated and dateModified are internal database timestamps, NOT actual song creation dates. See the schema resource (songs://schema) for complete field documentation.",
+            "_note": _SEARCH_NOTE,
             "result_count": len(results),
             "songs": results
         }
@@ -424,7 +659,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         return [
             TextContent(
                 type="text",
-                text=json.dumps(response_data, ensure_ascii=False, indent=2),
+                text=_json.dumps(response_data),
             )
         ]
 
@@ -441,11 +676,10 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         if not markup_url:
             return [TextContent(type="text", text="No lyrics URL found for this song")]
 
+        markup_version = lyrics_info.get("markupVersion")
+
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(markup_url, timeout=10.0)
-                response.raise_for_status()
-                lyrics_text = response.text
+            lyrics_text = await _fetch_lyrics(song["id"], markup_url, markup_version)
 
             result = {
                 "song_id": song_id,
@@ -457,7 +691,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             return [
                 TextContent(
                     type="text",
-                    text=json.dumps(result, ensure_ascii=False, indent=2),
+                    text=_json.dumps(result),
                 )
             ]
 
@@ -471,6 +705,12 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 
     elif name == "get_youtube_metadata":
         song_id = arguments["song_id"]
+        # The response echoes song_id as given, so 5 and 5.0 are cached apart
+        cache_key = f"get_youtube_metadata/{song_id!r}"
+        payload = _cached_payload(cache_key)
+        if payload is not None:
+            return [TextContent(type="text", text=payload)]
+
         song = db.get_song_by_id(song_id)
 
         if not song:
@@ -496,7 +736,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         return [
             TextContent(
                 type="text",
-                text=json.dumps(result, ensure_ascii=False, indent=2),
+                text=_store_payload(cache_key, _json.dumps(result)),
             )
         ]
 
@@ -510,32 +750,24 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         if lyricist and composer:
             # Specific collaboration
             collab_data = db.get_collaboration_songs(lyricist, composer)
-            if collab_data:
+            if collab_data and collab_data['song_count'] >= min_songs:
                 results = [collab_data]
             else:
                 results = []
         elif lyricist:
             # All collaborations for this lyricist
-            results = db.get_collaborations_by_lyricist(lyricist)
+            results = db.get_collaborations_by_lyricist(lyricist, limit=limit, min_songs=min_songs)
         elif composer:
             # All collaborations for this composer
-            results = db.get_collaborations_by_composer(composer)
+            results = db.get_collaborations_by_composer(composer, limit=limit, min_songs=min_songs)
         else:
             # All collaborations
-            results = db.get_all_collaborations()
-
-        # Apply min_songs filter
-        if min_songs > 1:
-            results = [r for r in results if r['song_count'] >= min_songs]
-
-        # Apply limit
-        if limit:
-            results = results[:limit]
+            results = db.get_all_collaborations(limit=limit, min_songs=min_songs)
 
         return [
             TextContent(
                 type="text",
-                text=json.dumps(results, ensure_ascii=False, indent=2),
+                text=_json.dumps(results),
             )
         ]
 
@@ -548,7 +780,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         return [
             TextContent(
                 type="text",
-                text=json.dumps(result, ensure_ascii=False, indent=2),
+                text=_json.dumps(result),
             )
         ]
 
@@ -560,133 +792,106 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 # MCP PROMPTS - Guided workflows
 # ============================================================================
 
+# Prompt definitions, identical on every listing; built once at import
+_PROMPTS: tuple[Prompt, ...] = (
+    Prompt(
+        name="explore_artist",
+        description="Deep dive into an artist's discography with analysis and insights",
+        arguments=[
+            {
+                "name": "artist_name",
+                "description": "The name of the artist to explore",
+                "required": True,
+            }
+        ],
+    ),
+    Prompt(
+        name="create_playlist",
+        description="Generate a curated playlist based on specific criteria",
+        arguments=[
+            {
+                "name": "theme",
+                "description": "Theme or mood for the playlist (e.g., 'upbeat Hebrew songs', 'romantic duets')",
+                "required": True,
+            },
+            {
+                "name": "size",
+                "description": "Number of songs in the playlist (default: 10)",
+                "required": False,
+            }
+        ],
+    ),
+    Prompt(
+        name="discover_similar",
+        description="Find songs similar to a given song based on artist, category, or era",
+        arguments=[
+            {
+                "name": "song_id",
+                "description": "ID of the song to find similar songs for",
+                "required": True,
+            },
+            {
+                "name": "limit",
+                "description": "Maximum number of similar songs to return (default: 5)",
+                "required": False,
+            }
+        ],
+    ),
+    Prompt(
+        name="explore_contributor",
+        description="Deep dive into a composer or lyricist's work with analysis and insights",
+        arguments=[
+            {
+                "name": "contributor_name",
+                "description": "The name of the composer or lyricist to explore",
+                "required": True,
+            },
+            {
+                "name": "contributor_type",
+                "description": "Type of contributor: 'composer' or 'lyricist'",
+                "required": True,
+            }
+        ],
+    ),
+    Prompt(
+        name="analyze_collaboration",
+        description="Explore the creative partnership between a lyricist and composer, including self-collaborations where one person does both",
+        arguments=[
+            {
+                "name": "lyricist",
+                "description": "The name of the lyricist",
+                "required": True,
+            },
+            {
+                "name": "composer",
+                "description": "The name of the composer (can be the same as lyricist for self-collaborations)",
+                "required": True,
+            }
+        ],
+    ),
+)
+
+
 @app.list_prompts()
 async def list_prompts() -> list[Prompt]:
     """List all available prompts."""
-    return [
-        Prompt(
-            name="explore_artist",
-            description="Deep dive into an artist's discography with analysis and insights",
-            arguments=[
-                {
-                    "name": "artist_name",
-                    "description": "The name of the artist to explore",
-                    "required": True,
-                }
-            ],
-        ),
-        Prompt(
-            name="create_playlist",
-            description="Generate a curated playlist based on specific criteria",
-            arguments=[
-                {
-                    "name": "theme",
-                    "description": "Theme or mood for the playlist (e.g., 'upbeat Hebrew songs', 'romantic duets')",
-                    "required": True,
-                },
-                {
-                    "name": "size",
-                    "description": "Number of songs in the playlist (default: 10)",
-                    "required": False,
-                }
-            ],
-        ),
-        Prompt(
-            name="discover_similar",
-            description="Find songs similar to a given song based on artist, category, or era",
-            arguments=[
-                {
-                    "name": "song_id",
-                    "description": "ID of the song to find similar songs for",
-                    "required": True,
-                },
-                {
-                    "name": "limit",
-                    "description": "Maximum number of similar songs to return (default: 5)",
-                    "required": False,
-                }
-            ],
-        ),
-        Prompt(
-            name="explore_contributor",
-            description="Deep dive into a composer or lyricist's work with analysis and insights",
-            arguments=[
-                {
-                    "name": "contributor_name",
-                    "description": "The name of the composer or lyricist to explore",
-                    "required": True,
-                },
-                {
-                    "name": "contributor_type",
-                    "description": "Type of contributor: 'composer' or 'lyricist'",
-                    "required": True,
-                }
-            ],
-        ),
-        Prompt(
-            name="analyze_collaboration",
-            description="Explore the creative partnership between a lyricist and composer, including self-collaborations where one person does both",
-            arguments=[
-                {
-                    "name": "lyricist",
-                    "description": "The name of the lyricist",
-                    "required": True,
-                },
-                {
-                    "name": "composer",
-                    "description": "The name of the composer (can be the same as lyricist for self-collaborations)",
-                    "required": True,
-                }
-            ],
-        ),
-    ]
-
+    return list(_PROMPTS)
 
-@app.get_prompt()
-async def get_prompt(name: str, arguments: dict) -> GetPromptResult:
-    """Handle prompt requests."""
 
-    if name == "explore_artist":
-        artist_name = arguments["artist_name"]
-        songs = db.get_songs_by_artist(artist_name)
-
-        if not songs:
-            prompt_text = f"No songs found for artist: {artist_name}. Please check the artist name and try again."
-        else:
-            songs_data = json.dumps(songs, ensure_ascii=False, indent=2)
-            prompt_text = f"""Analyze the discography of {artist_name} based on the following songs:
+# Prompt text templates, filled in with str.format by get_prompt
+_EXPLORE_ARTIST_PROMPT = """Analyze the discography of {artist_name} based on the following songs:
 
 {songs_data}
 
 Please provide:
-1. An overview of their musical presence in this library ({len(songs)} songs)
+1. An overview of their musical presence in this library ({song_count} songs)
 2. The categories/genres they appear in
 3. Any patterns in their song titles or themes
 4. Notable collaborations with composers and lyricists
 5. Notable songs or recommendations from their collection
 """
 
-        return GetPromptResult(
-            description=f"Exploring the discography of {artist_name}",
-            messages=[
-                PromptMessage(
-                    role="user",
-                    content=TextContent(type="text", text=prompt_text),
-                )
-            ],
-        )
-
-    elif name == "create_playlist":
-        theme = arguments["theme"]
-        size = int(arguments.get("size", 10))
-
-        stats = db.get_stats()
-        all_songs = db.get_all_songs(limit=200)
-
-        songs_data = json.dumps(all_songs, ensure_ascii=False, indent=2)
-        categories_data = json.dumps(stats["categories"], ensure_ascii=False, indent=2)
-
-        prompt_text = f"""Create a playlist with the theme: "{theme}"
+_CREATE_PLAYLIST_PROMPT = """Create a playlist with the theme: "{theme}"
 
 The playlist should contain {size} songs.
 
@@ -703,47 +908,7 @@ Please:
 4. Provide a catchy name for the playlist
 """
 
-        return GetPromptResult(
-            description=f"Creating a playlist: {theme}",
-            messages=[
-                PromptMessage(
-                    role="user",
-                    content=TextContent(type="text", text=prompt_text),
-                )
-            ],
-        )
-
-    elif name == "discover_similar":
-        song_id = int(arguments["song_id"])
-        limit = int(arguments.get("limit", 5))
-
-        song = db.get_song_by_id(song_id)
-
-        if not song:
-            prompt_text = f"Song with ID {song_id} not found."
-        else:
-            artist = song.get("singer", "")
-            category_ids = song.get("categoryIds", [])
-
-            # Get songs by same artist
-            artist_songs = db.get_songs_by_artist(artist) if artist else []
-
-            # Get songs in same categories
-            category_songs = []
-            for cat_id in category_ids:
-                category_songs.extend(db.get_songs_by_category(cat_id))
-
-            # Combine and deduplicate
-            similar_songs = {s["id"]: s for s in artist_songs + category_songs}
-            # Remove the original song
-            similar_songs.pop(song_id, None)
-
-            similar_list = list(similar_songs.values())[:limit * 2]
-
-            song_data = json.dumps(song, ensure_ascii=False, indent=2)
-            similar_data = json.dumps(similar_list, ensure_ascii=False, indent=2)
-
-            prompt_text = f"""Find songs similar to:
+_DISCOVER_SIMILAR_PROMPT = """Find songs similar to:
 
 {song_data}
 
@@ -756,48 +921,12 @@ Please:
 3. Rank them by similarity
 """
 
-        return GetPromptResult(
-            description=f"Finding songs similar to song ID {song_id}",
-            messages=[
-                PromptMessage(
-                    role="user",
-                    content=TextContent(type="text", text=prompt_text),
-                )
-            ],
-        )
-
-    elif name == "explore_contributor":
-        contributor_name = arguments["contributor_name"]
-        contributor_type = arguments["contributor_type"].lower()
-
-        if contributor_type == "composer":
-            songs = db.get_songs_by_composer(contributor_name)
-            role_desc = "composed"
-        elif contributor_type == "lyricist":
-            songs = db.get_songs_by_lyricist(contributor_name)
-            role_desc = "wrote lyrics for"
-        else:
-            prompt_text = f"Invalid contributor type: {contributor_type}. Must be 'composer' or 'lyricist'."
-            return GetPromptResult(
-                description=f"Error exploring contributor",
-                messages=[
-                    PromptMessage(
-                        role="user",
-                        content=TextContent(type="text", text=prompt_text),
-                    )
-                ],
-            )
-
-        if not songs:
-            prompt_text = f"No songs found for {contributor_type} {contributor_name}. Please check the name and try again."
-        else:
-            songs_data = json.dumps(songs, ensure_ascii=False, indent=2)
-            prompt_text = f"""Analyze the work of {contributor_type} {contributor_name} based on the following songs they {role_desc}:
+_EXPLORE_CONTRIBUTOR_PROMPT = """Analyze the work of {contributor_type} {contributor_name} based on the following songs they {role_desc}:
 
 {songs_data}
 
 Please provide:
-1. An overview of their contribution to this library ({len(songs)} songs)
+1. An overview of their contribution to this library ({song_count} songs)
 2. The artists they worked with most frequently
 3. The categories/genres they contributed to
 4. Any patterns in the songs they worked on (themes, styles, eras)
@@ -805,43 +934,7 @@ Please provide:
 6. Their most significant or representative works from this collection
 """
 
-        return GetPromptResult(
-            description=f"Exploring the work of {contributor_type} {contributor_name}",
-            messages=[
-                PromptMessage(
-                    role="user",
-                    content=TextContent(type="text", text=prompt_text),
-                )
-            ],
-        )
-
-    elif name == "analyze_collaboration":
-        lyricist = arguments["lyricist"]
-        composer = arguments["composer"]
-        
-        collab_data = db.get_collaboration_songs(lyricist, composer)
-        
-        if not collab_data:
-            prompt_text = f"No collaboration found between {lyricist} (lyrics) and {composer} (music). Please check the names and try again."
-            return GetPromptResult(
-                description="Collaboration not found",
-                messages=[
-                    PromptMessage(
-                        role="user",
-                        content=TextContent(type="text", text=prompt_text),
-                    )
-                ],
-            )
-        
-        songs = collab_data['songs']
-        song_count = collab_data['song_count']
-        is_self_collab = lyricist.lower().strip() == composer.lower().strip()
-        
-        songs_data = json.dumps(songs, ensure_ascii=False, indent=2)
-        
-        if is_self_collab:
-            # Self-collaboration prompt (one person doing both lyrics and music)
-            prompt_text = f"""Analyze the creative artistry of {lyricist}, who wrote both the lyrics and music for {song_count} songs in this collection.
+_SELF_COLLABORATION_PROMPT = """Analyze the creative artistry of {lyricist}, who wrote both the lyrics and music for {song_count} songs in this collection.
 
 {songs_data}
 
@@ -861,9 +954,7 @@ This is a fascinating case of complete artistic control where one person crafts
 
 Think of this as understanding the mind of an auteur - someone whose complete creative vision flows through every note and word."""
 
-        else:
-            # True collaboration between two different people
-            prompt_text = f"""Analyze the creative partnership between {lyricist} (lyrics) and {composer} (music), who collaborated on {song_count} songs together.
+_COLLABORATION_PROMPT = """Analyze the creative partnership between {lyricist} (lyrics) and {composer} (music), who collaborated on {song_count} songs together.
 
 {songs_data}
 
@@ -887,16 +978,189 @@ This is a dance between words and music, where two creative minds come together.
 
 Think of this as exploring a creative marriage - two artists whose combined work is greater than the sum of its parts."""
 
-        return GetPromptResult(
-            description=f"Analyzing collaboration: {lyricist} × {composer}",
-            messages=[
-                PromptMessage(
-                    role="user",
-                    content=TextContent(type="text", text=prompt_text),
-                )
-            ],
+
+def _user_prompt(description: str, text: str) -> GetPromptResult:
+    """Wrap prompt text as a single user message.
+
+    The models are built with model_construct, skipping pydantic validation;
+    every field here is a plain string produced by get_prompt itself.
+    """
+    return GetPromptResult.model_construct(
+        description=description,
+        messages=[
+            PromptMessage.model_construct(
+                role="user",
+                content=TextContent.model_construct(type="text", text=text),
+            )
+        ],
+    )
+
+
+def _int_argument(arguments: dict, name: str, default: Optional[int] = None) -> int:
+    """Parse an integer prompt argument, naming it in the error if invalid."""
+    value = arguments[name] if default is None else arguments.get(name, default)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name}: {value!r} (expected an integer)") from None
+
+
+@app.get_prompt()
+async def get_prompt(name: str, arguments: dict) -> GetPromptResult:
+    """Handle prompt requests."""
+
+    if name == "explore_artist":
+        artist_name = arguments["artist_name"]
+        songs = db.get_songs_by_artist(artist_name)
+
+        if not songs:
+            prompt_text = f"No songs found for artist: {artist_name}. Please check the artist name and try again."
+        else:
+            songs_data = _json.dumps_indented(songs)
+            prompt_text = _EXPLORE_ARTIST_PROMPT.format(
+                artist_name=artist_name,
+                songs_data=songs_data,
+                song_count=len(songs),
+            )
+
+        return _user_prompt(f"Exploring the discography of {artist_name}", prompt_text)
+
+    elif name == "create_playlist":
+        theme = arguments["theme"]
+        size = _int_argument(arguments, "size", 10)
+
+        # The category list and song sample do not depend on the theme, so
+        # their JSON is serialized once per database (per sample size)
+        categories_data = _cached_payload("create_playlist/categories")
+        if categories_data is None:
+            stats = db.get_stats()
+            categories_data = _store_payload(
+                "create_playlist/categories", _json.dumps_indented(stats["categories"])
+            )
+        # Offer five candidates per requested song (at least 30, at most
+        # 200) rather than always 200
+        candidate_limit = min(200, max(size * 5, 30))
+        songs_key = f"create_playlist/songs/{candidate_limit}"
+        songs_data = _cached_payload(songs_key)
+        if songs_data is None:
+            all_songs = db.get_all_songs(limit=candidate_limit)
+            songs_data = _store_payload(songs_key, _json.dumps_indented(all_songs))
+
+        prompt_text = _CREATE_PLAYLIST_PROMPT.format(
+            theme=theme,
+            size=size,
+            categories_data=categories_data,
+            songs_data=songs_data,
         )
 
+        return _user_prompt(f"Creating a playlist: {theme}", prompt_text)
+
+    elif name == "discover_similar":
+        song_id = _int_argument(arguments, "song_id")
+        limit = _int_argument(arguments, "limit", 5)
+
+        song = db.get_song_by_id(song_id)
+
+        if not song:
+            prompt_text = f"Song with ID {song_id} not found."
+        else:
+            artist = song.get("singer", "")
+            category_ids = song.get("categoryIds", [])
+
+            # Get songs by same artist
+            artist_songs = db.get_songs_by_artist(artist) if artist else []
+
+            # Get songs in same categories, one category at a time so that
+            # the later ones are not fetched once enough candidates are found
+            category_songs = chain.from_iterable(
+                db.get_songs_by_category(cat_id) for cat_id in category_ids
+            )
+
+            # Combine and deduplicate, skipping the original song
+            similar_list = []
+            seen_ids = {song_id}
+            for candidate in chain(artist_songs, category_songs):
+                if len(similar_list) >= limit * 2:
+                    break
+                candidate_id = candidate["id"]
+                if candidate_id not in seen_ids:
+                    seen_ids.add(candidate_id)
+                    similar_list.append(candidate)
+
+            song_data = _json.dumps_indented(song)
+            similar_data = _json.dumps_indented(similar_list)
+
+            prompt_text = _DISCOVER_SIMILAR_PROMPT.format(
+                song_data=song_data,
+                similar_data=similar_data,
+                limit=limit,
+            )
+
+        return _user_prompt(f"Finding songs similar to song ID {song_id}", prompt_text)
+
+    elif name == "explore_contributor":
+        contributor_name = arguments["contributor_name"]
+        contributor_type = arguments["contributor_type"].lower()
+
+        if contributor_type == "composer":
+            songs = db.get_songs_by_composer(contributor_name)
+            role_desc = "composed"
+        elif contributor_type == "lyricist":
+            songs = db.get_songs_by_lyricist(contributor_name)
+            role_desc = "wrote lyrics for"
+        else:
+            prompt_text = f"Invalid contributor type: {contributor_type}. Must be 'composer' or 'lyricist'."
+            return _user_prompt(f"Error exploring contributor", prompt_text)
+
+        if not songs:
+            prompt_text = f"No songs found for {contributor_type} {contributor_name}. Please check the name and try again."
+        else:
+            songs_data = _json.dumps_indented(songs)
+            prompt_text = _EXPLORE_CONTRIBUTOR_PROMPT.format(
+                contributor_type=contributor_type,
+                contributor_name=contributor_name,
+                role_desc=role_desc,
+                songs_data=songs_data,
+                song_count=len(songs),
+            )
+
+        return _user_prompt(f"Exploring the work of {contributor_type} {contributor_name}", prompt_text)
+
+    elif name == "analyze_collaboration":
+        lyricist = arguments["lyricist"]
+        composer = arguments["composer"]
+        
+        collab_data = db.get_collaboration_songs(lyricist, composer)
+        
+        if not collab_data:
+            prompt_text = f"No collaboration found between {lyricist} (lyrics) and {composer} (music). Please check the names and try again."
+            return _user_prompt("Collaboration not found", prompt_text)
+        
+        songs = collab_data['songs']
+        song_count = collab_data['song_count']
+        is_self_collab = collab_data['is_self_collab']
+        
+        songs_data = _json.dumps_indented(songs)
+        
+        if is_self_collab:
+            # Self-collaboration prompt (one person doing both lyrics and music)
+            prompt_text = _SELF_COLLABORATION_PROMPT.format(
+                lyricist=lyricist,
+                song_count=song_count,
+                songs_data=songs_data,
+            )
+
+        else:
+            # True collaboration between two different people
+            prompt_text = _COLLABORATION_PROMPT.format(
+                lyricist=lyricist,
+                composer=composer,
+                song_count=song_count,
+                songs_data=songs_data,
+            )
+
+        return _user_prompt(f"Analyzing collaboration: {lyricist} × {composer}", prompt_text)
+
     else:
         raise ValueError(f"Unknown prompt: {name}")
 
@@ -907,12 +1171,18 @@ Think of this as exploring a creative marriage - two artists whose combined work
 
 async def main():
     """Main entry point for the server."""
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options(),
-        )
+    global _http_client
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options(),
+            )
+    finally:
+        if _http_client is not None:
+            await _http_client.aclose()
+            _http_client = None
 
 
 def run():
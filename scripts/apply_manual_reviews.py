@@ -4,10 +4,23 @@ Apply manual reviews from manual_reviews.json to songs_enriched.json.
 Creates a new file songs_enriched_final.json without modifying the original.
 """
 
-import json
+import os
 import sys
 from pathlib import Path
 
+# Add the package to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from music_library_mcp._json import load_json, write_songs_json
+
+
+# Fields removed from a song before its review is applied
+REPLACED_FIELDS = ('needsManualReview', 'unparsedString', 'composers', 'lyricists', 'translators')
+
+# Field order of a reviewed song; any other fields follow in their original order
+FIELD_ORDER = ('id', 'name', 'singer', 'composers', 'lyricists', 'translators',
+               'playback', 'isPrivate', 'categoryIds', 'lyrics', 'dateCreated', 'dateModified')
+
 
 def apply_manual_reviews(
     songs_path: str,
@@ -25,8 +38,7 @@ def apply_manual_reviews(
     
     # Load songs
     print(f"Loading songs from: {songs_path}")
-    with open(songs_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_json(songs_path)
     
     # Load manual reviews
     print(f"Loading manual reviews from: {reviews_path}")
@@ -34,8 +46,7 @@ def apply_manual_reviews(
         print("Warning: manual_reviews.json not found. No reviews to apply.")
         return
     
-    with open(reviews_path, 'r', encoding='utf-8') as f:
-        manual_reviews = json.load(f)
+    manual_reviews = load_json(reviews_path)
     
     print(f"Found {len(manual_reviews)} manual reviews to apply")
     
@@ -49,38 +60,25 @@ def apply_manual_reviews(
         if song_id in manual_reviews:
             review = manual_reviews[song_id]
             
-            # Build a temporary dict with all data
-            temp_song = {}
-            for key in song.keys():
-                if key not in ['needsManualReview', 'unparsedString', 'composers', 'lyricists', 'translators']:
-                    temp_song[key] = song[key]
+            # Drop the review markers and the credits being replaced
+            for key in REPLACED_FIELDS:
+                song.pop(key, None)
             
             # Add review data
             if 'composers' in review and review['composers']:
-                temp_song['composers'] = review['composers']
+                song['composers'] = review['composers']
             if 'lyricists' in review and review['lyricists']:
-                temp_song['lyricists'] = review['lyricists']
+                song['lyricists'] = review['lyricists']
             if 'translators' in review and review['translators']:
-                temp_song['translators'] = review['translators']
-            
-            # Rebuild song dictionary with correct field order
-            # Order: id, name, singer, composers, lyricists, translators, playback, isPrivate, categoryIds, lyrics, dateCreated, dateModified
-            final_song = {}
-            field_order = ['id', 'name', 'singer', 'composers', 'lyricists', 'translators', 
-                          'playback', 'isPrivate', 'categoryIds', 'lyrics', 'dateCreated', 'dateModified']
+                song['translators'] = review['translators']
             
-            for field in field_order:
-                if field in temp_song:
-                    final_song[field] = temp_song[field]
-            
-            # Add any remaining fields not in field_order
-            for key, value in temp_song.items():
-                if key not in final_song:
-                    final_song[key] = value
-            
-            # Update the song dictionary
-            song.clear()
-            song.update(final_song)
+            # Reorder the song in place: re-inserting a key moves it to the
+            # end, so move the known fields in order, then the remaining ones
+            for field in FIELD_ORDER:
+                if field in song:
+                    song[field] = song.pop(field)
+            for key in [key for key in song if key not in FIELD_ORDER]:
+                song[key] = song.pop(key)
             
             applied_count += 1
     
@@ -88,24 +86,18 @@ def apply_manual_reviews(
     print(f"\nApplied {applied_count} manual reviews")
     print(f"Saving to: {output_path}")
     
-    # Use same formatting as enriched file (tabs, one-liner arrays)
-    import re
-    
-    json_str = json.dumps(data, ensure_ascii=False, indent="\t")
-    
-    # Format arrays as one-liners
-    def compress_array(match):
-        field_name = match.group(1)
-        array_content = match.group(2)
-        array_items = re.findall(r'"([^"]*)"', array_content)
-        one_liner = ', '.join([f'"{item}"' for item in array_items])
-        return f'"{field_name}": [{one_liner}]'
-    
-    pattern = r'"(composers|lyricists|translators|categoryIds)":\s*\[\s*((?:"[^"]*"\s*,?\s*)*)\s*\]'
-    json_str = re.sub(pattern, compress_array, json_str, flags=re.MULTILINE | re.DOTALL)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(json_str)
+    # Use same formatting as enriched file (tabs, one-liner arrays).
+    # Write to a temporary file and rename it over the output, so an
+    # interrupted run never leaves a truncated output file behind.
+    tmp_path = output_path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            write_songs_json(data, f)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
     
     print(f"\n✓ Successfully created {output_path}")
     
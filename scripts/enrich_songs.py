@@ -3,44 +3,92 @@
 Enrich songs.json with lyricist and composer information extracted from lyrics files.
 """
 
-import json
 import re
 import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from typing import Tuple, List, Optional, Dict
 from pathlib import Path
 
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+# Add the package to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from music_library_mcp._json import load_json, write_songs_json
+
+
+# Lyrics URLs under SONGS_URL_MARKER map to files under SONGS_BASE_PATH
+SONGS_URL_MARKER = "raw.githubusercontent.com/KidCrippler/songs/master/"
+SONGS_BASE_PATH = "/Users/alonc/songs/"
+
+# Written next to the enriched output; read by review_app.py
+REVIEW_QUEUE_FILENAME = "songs_review_queue.json"
+
+# Name connectors: &, –, -, and, ו (Hebrew vav conjunction), ,
+# Hebrew ו can appear as " ו" or " ו[letter]" (attached to next word)
+NAME_SEPARATOR_RE = re.compile(r'[&,]|–(?!-)|\sand\s|\sו')
+# (+X) patterns like (+1), (+2), etc.
+PLUS_COUNT_RE = re.compile(r'\s*\(\+\d+\)\s*')
+
+# Hebrew labels: מילים: [names]   לחן: [names]   תרגום: [names]   מילים ולחן: [names]
+HEBREW_TRANSLATOR_RE = re.compile(r'תרגום\s*:\s*([^\n]+?)(?:\s+(?:מילים|לחן)|$)')
+HEBREW_COMBINED_RE = re.compile(r'מילים\s*ולחן\s*:\s*([^\n\t]+?)(?:\s+תרגום|$)')
+HEBREW_LYRICS_RE = re.compile(r'מילים\s*:\s*([^\n\t]+?)(?:\s+(?:לחן|תרגום)|$)')
+HEBREW_MUSIC_RE = re.compile(r'לחן\s*:\s*([^\n\t]+?)(?:\s+(?:מילים|תרגום)|$)')
+
+# English labels: Lyrics and Music: [names]   Lyrics: [names]   Music: [names]
+ENGLISH_COMBINED_RE = re.compile(r'Lyrics\s+and\s+Music\s*:\s*([^\n]+)', re.IGNORECASE)
+ENGLISH_LYRICS_RE = re.compile(r'Lyrics\s*:\s*([^\n]+?)(?:\s+Music|$)', re.IGNORECASE)
+ENGLISH_MUSIC_RE = re.compile(r'Music\s*:\s*([^\n]+?)(?:\s+Lyrics|$)', re.IGNORECASE)
+
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.webp', '.gif'})
+
+# Credits parsed from a lyrics file; immutable so cached results can be shared
+CreditsResult = namedtuple(
+    'CreditsResult',
+    'composers lyricists translators needsManualReview parsingUncertain unparsedString'
+)
+
 
 def url_to_filepath(url: str) -> str:
     """Convert GitHub raw URL to local file path."""
     # https://raw.githubusercontent.com/KidCrippler/songs/master/hebrew_ophir/page2.txt
     # -> /Users/alonc/songs/hebrew_ophir/page2.txt
-    base_path = "/Users/alonc/songs/"
-    if "raw.githubusercontent.com/KidCrippler/songs/master/" in url:
-        relative_path = url.split("raw.githubusercontent.com/KidCrippler/songs/master/")[1]
-        return base_path + relative_path
+    _, marker, relative_path = url.partition(SONGS_URL_MARKER)
+    if marker:
+        return SONGS_BASE_PATH + relative_path
     return None
 
 
 def is_image_file(filepath: str) -> bool:
     """Check if file is an image."""
-    extensions = ['.jpg', '.jpeg', '.png', '.webp', '.gif']
-    return any(filepath.lower().endswith(ext) for ext in extensions)
+    dot = filepath.rfind('.')
+    return dot >= 0 and filepath[dot:].lower() in IMAGE_EXTENSIONS
 
 
 def split_names(name_string: str) -> List[str]:
     """Split multiple names on various connectors."""
-    # Split on: &, –, -, and, ו (Hebrew vav conjunction), ,
-    # Hebrew ו can appear as " ו" or " ו[letter]" (attached to next word)
-    # Use regex to split on these delimiters
-    separators = r'[&,]|–(?!-)|\sand\s|\sו'
-    parts = re.split(separators, name_string)
+    # Most credits are a single name: skip the split when no connector can match
+    if ('&' in name_string or ',' in name_string or '–' in name_string
+            or 'and' in name_string or 'ו' in name_string):
+        parts = NAME_SEPARATOR_RE.split(name_string)
+    else:
+        parts = (name_string,)
     
     # Clean up whitespace, remove (+X) patterns, and filter empty strings
     names = []
     for name in parts:
         name = name.strip()
         # Remove (+X) patterns like (+1), (+2), etc.
-        name = re.sub(r'\s*\(\+\d+\)\s*', '', name).strip()
+        if '(+' in name:
+            name = PLUS_COUNT_RE.sub('', name).strip()
         if name:
             names.append(name)
     return names
@@ -68,6 +116,13 @@ def parse_hebrew_slash_format(first_line: str) -> Tuple[Optional[List[str]], Opt
     return None, None, False, ""
 
 
+def parse_hebrew_translators(first_lines: List[str]) -> Optional[List[str]]:
+    """Parse only the Hebrew translator label (תרגום: [names])."""
+    text = '\n'.join(first_lines[:3])  # Check first 3 lines
+    translator_match = HEBREW_TRANSLATOR_RE.search(text)
+    return split_names(translator_match.group(1).strip()) if translator_match else None
+
+
 def parse_hebrew_labels(first_lines: List[str]) -> Tuple[Optional[List[str]], Optional[List[str]], Optional[List[str]], bool, str]:
     """
     Parse Hebrew format with explicit labels:
@@ -77,25 +132,18 @@ def parse_hebrew_labels(first_lines: List[str]) -> Tuple[Optional[List[str]], Op
     """
     text = '\n'.join(first_lines[:3])  # Check first 3 lines
     
-    # Pattern for translator
-    translator_pattern = r'תרגום\s*:\s*([^\n]+?)(?:\s+(?:מילים|לחן)|$)'
-    translator_match = re.search(translator_pattern, text)
+    translator_match = HEBREW_TRANSLATOR_RE.search(text)
     translators = split_names(translator_match.group(1).strip()) if translator_match else None
     
-    # Pattern for combined: מילים ולחן:
-    # Need to exclude translator part if it exists
-    combined_pattern = r'מילים\s*ולחן\s*:\s*([^\n\t]+?)(?:\s+תרגום|$)'
-    combined_match = re.search(combined_pattern, text)
+    # Combined מילים ולחן: excludes the translator part if it exists
+    combined_match = HEBREW_COMBINED_RE.search(text)
     if combined_match:
         names = split_names(combined_match.group(1).strip())
         return names, names, translators, False, ""
     
-    # Pattern for separate labels
-    lyrics_pattern = r'מילים\s*:\s*([^\n\t]+?)(?:\s+(?:לחן|תרגום)|$)'
-    music_pattern = r'לחן\s*:\s*([^\n\t]+?)(?:\s+(?:מילים|תרגום)|$)'
-    
-    lyrics_match = re.search(lyrics_pattern, text)
-    music_match = re.search(music_pattern, text)
+    # Separate labels
+    lyrics_match = HEBREW_LYRICS_RE.search(text)
+    music_match = HEBREW_MUSIC_RE.search(text)
     
     if lyrics_match or music_match:
         lyricists = split_names(lyrics_match.group(1).strip()) if lyrics_match else None
@@ -113,19 +161,14 @@ def parse_english_labels(first_lines: List[str]) -> Tuple[Optional[List[str]], O
     """
     text = '\n'.join(first_lines[:3])  # Check first 3 lines
     
-    # Pattern for combined: Lyrics and Music:
-    combined_pattern = r'Lyrics\s+and\s+Music\s*:\s*([^\n]+)'
-    combined_match = re.search(combined_pattern, text, re.IGNORECASE)
+    combined_match = ENGLISH_COMBINED_RE.search(text)
     if combined_match:
         names = split_names(combined_match.group(1).strip())
         return names, names, False, ""
     
-    # Pattern for separate labels
-    lyrics_pattern = r'Lyrics\s*:\s*([^\n]+?)(?:\s+Music|$)'
-    music_pattern = r'Music\s*:\s*([^\n]+?)(?:\s+Lyrics|$)'
-    
-    lyrics_match = re.search(lyrics_pattern, text, re.IGNORECASE)
-    music_match = re.search(music_pattern, text, re.IGNORECASE)
+    # Separate labels
+    lyrics_match = ENGLISH_LYRICS_RE.search(text)
+    music_match = ENGLISH_MUSIC_RE.search(text)
     
     if lyrics_match or music_match:
         lyricists = split_names(lyrics_match.group(1).strip()) if lyrics_match else None
@@ -135,9 +178,18 @@ def parse_english_labels(first_lines: List[str]) -> Tuple[Optional[List[str]], O
     return None, None, False, ""
 
 
-def extract_credits(filepath: str) -> Dict:
+@lru_cache(maxsize=None)
+def extract_credits(filepath: str) -> CreditsResult:
     """
     Extract composer, lyricist, and translator information from a lyrics file.
+    Cached per filepath, since several songs can share one lyrics file.
+    """
+    return CreditsResult(**parse_credits_file(filepath))
+
+
+def parse_credits_file(filepath: str) -> Dict:
+    """
+    Parse the credits at the top of a lyrics file.
     Returns dict with keys: composers, lyricists, translators, needsManualReview, parsingUncertain, unparsedString
     """
     result = {
@@ -151,7 +203,7 @@ def extract_credits(filepath: str) -> Dict:
     
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
-            lines = [line.strip() for line in f.readlines()[:5]]  # Read first 5 lines
+            lines = [line.strip() for line in islice(f, 5)]  # Read first 5 lines
             
         if not lines:
             result["needsManualReview"] = True
@@ -166,8 +218,7 @@ def extract_credits(filepath: str) -> Dict:
             if uncertain:
                 result["unparsedString"] = unparsed
             # Check for translators in label format even if slash format matched
-            _, _, translators, _, _ = parse_hebrew_labels(lines)
-            result["translators"] = translators
+            result["translators"] = parse_hebrew_translators(lines)
             return result
         
         # Try Hebrew label format
@@ -205,6 +256,25 @@ def extract_credits(filepath: str) -> Dict:
     return result
 
 
+def insert_song_fields(song: Dict, fields: Dict) -> None:
+    """
+    Reorder song in place, inserting fields after "singer" and moving
+    isPrivate after "playback".
+    Order: id, name, singer, [fields], playback, isPrivate, categoryIds, ...rest
+    """
+    is_private = song.pop("isPrivate", None)
+    items = []
+    for key, value in song.items():
+        items.append((key, value))
+        if key == "singer":
+            items.extend(fields.items())
+        elif key == "playback" and is_private is not None:
+            items.append(("isPrivate", is_private))
+    
+    song.clear()
+    song.update(items)
+
+
 def enrich_songs(input_path: str, output_path: str):
     """Main function to enrich songs.json with composer/lyricist data."""
     
@@ -222,8 +292,7 @@ def enrich_songs(input_path: str, output_path: str):
     
     # Read input JSON
     print(f"Reading {input_path}...")
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_json(input_path)
     
     # Update version
     data["version"] = "2025_10_09"
@@ -234,153 +303,104 @@ def enrich_songs(input_path: str, output_path: str):
     
     print(f"Processing {stats['total_songs']} songs...")
     
-    for i, song in enumerate(songs):
-        if (i + 1) % 100 == 0:
-            print(f"  Processed {i + 1}/{stats['total_songs']} songs...")
-        
+    # Resolve each song's lyrics file once: (markup URL, file path, is image)
+    song_files = []
+    for song in songs:
+        markup_url = song.get("lyrics", {}).get("markupUrl")
+        filepath = url_to_filepath(markup_url) if markup_url else None
+        song_files.append((markup_url, filepath, bool(filepath) and is_image_file(filepath)))
+    
+    # Parse the lyrics files on a thread pool first, overlapping the file
+    # reads; the loop below then gets each result from extract_credits's
+    # cache, in song order
+    filepaths = dict.fromkeys(
+        filepath for _, filepath, is_image in song_files if filepath and not is_image
+    )
+    # This is where the time goes, so progress is reported here
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        results = executor.map(extract_credits, filepaths)
+        if tqdm is not None:
+            for _ in tqdm(results, total=len(filepaths), unit='file', desc='  Parsing lyrics'):
+                pass
+        else:
+            for done, _ in enumerate(results, 1):
+                if done % 100 == 0:
+                    print(f"  Parsed {done}/{len(filepaths)} lyrics files...")
+    
+    for song, (markup_url, filepath, is_image) in zip(songs, song_files):
         # Check if song has lyrics URL
-        lyrics = song.get("lyrics", {})
-        markup_url = lyrics.get("markupUrl")
-        
         if not markup_url:
             # Add needsManualReview flag for songs without lyrics URL
-            ordered_song = {}
-            isPrivate_value = song.get("isPrivate")
-            
-            for key in song.keys():
-                if key == "isPrivate":
-                    continue  # Will add after playback
-                ordered_song[key] = song[key]
-                if key == "singer":
-                    ordered_song["needsManualReview"] = True
-                elif key == "playback" and isPrivate_value is not None:
-                    ordered_song["isPrivate"] = isPrivate_value
-            
-            song.clear()
-            song.update(ordered_song)
+            insert_song_fields(song, {"needsManualReview": True})
             stats["no_lyrics_url"] += 1
             stats["needs_manual_review"] += 1
             continue
         
-        # Convert URL to filepath
-        filepath = url_to_filepath(markup_url)
+        # URL not under the songs repository
         if not filepath:
-            # Create ordered dict with needsManualReview after singer
-            ordered_song = {}
-            isPrivate_value = song.get("isPrivate")
-            
-            for key in song.keys():
-                if key == "isPrivate":
-                    continue  # Will add after playback
-                ordered_song[key] = song[key]
-                if key == "singer":
-                    ordered_song["needsManualReview"] = True
-                elif key == "playback" and isPrivate_value is not None:
-                    ordered_song["isPrivate"] = isPrivate_value
-            
-            song.clear()
-            song.update(ordered_song)
+            insert_song_fields(song, {"needsManualReview": True})
             stats["needs_manual_review"] += 1
             continue
         
         # Skip image files
-        if is_image_file(filepath):
+        if is_image:
             # Add needsManualReview flag for image files
-            ordered_song = {}
-            isPrivate_value = song.get("isPrivate")
-            
-            for key in song.keys():
-                if key == "isPrivate":
-                    continue  # Will add after playback
-                ordered_song[key] = song[key]
-                if key == "singer":
-                    ordered_song["needsManualReview"] = True
-                elif key == "playback" and isPrivate_value is not None:
-                    ordered_song["isPrivate"] = isPrivate_value
-            
-            song.clear()
-            song.update(ordered_song)
+            insert_song_fields(song, {"needsManualReview": True})
             stats["image_files_skipped"] += 1
             stats["needs_manual_review"] += 1
             continue
         
-        # Extract credits
-        credits = extract_credits(filepath)
-        
-        # Build temp dict excluding fields we'll position explicitly
-        temp_song = {}
-        isPrivate_value = None
+        # Extract credits, unpacked once into locals
+        (composers, lyricists, translators,
+         needs_review, uncertain, unparsed) = extract_credits(filepath)
         
-        for key in song.keys():
-            if key == "isPrivate":
-                isPrivate_value = song[key]
-            elif key not in ["composers", "lyricists", "translators"]:
-                temp_song[key] = song[key]
+        # Fields inserted after "singer", replacing any existing credits.
+        # Copy the cached lists so songs never share them
+        credit_fields = {}
+        if composers:
+            credit_fields["composers"] = list(composers)
+        if lyricists:
+            credit_fields["lyricists"] = list(lyricists)
+        if translators:
+            credit_fields["translators"] = list(translators)
+        if needs_review:
+            credit_fields["needsManualReview"] = True
+            if unparsed:
+                credit_fields["unparsedString"] = unparsed
+        if uncertain:
+            credit_fields["parsingUncertain"] = True
+            if unparsed:
+                credit_fields["unparsedString"] = unparsed
         
-        # Reconstruct song dict with proper field order
-        # Order: id, name, singer, composers, lyricists, translators, needsManualReview, unparsedString, playback, isPrivate, categoryIds, ...rest
-        ordered_song = {}
-        
-        for key in temp_song.keys():
-            ordered_song[key] = temp_song[key]
-            
-            # After "singer", insert the credit fields
-            if key == "singer":
-                if credits["composers"]:
-                    ordered_song["composers"] = credits["composers"]
-                if credits["lyricists"]:
-                    ordered_song["lyricists"] = credits["lyricists"]
-                if credits["translators"]:
-                    ordered_song["translators"] = credits["translators"]
-                    stats["with_translators"] += 1
-                
-                if credits["needsManualReview"]:
-                    ordered_song["needsManualReview"] = True
-                    stats["needs_manual_review"] += 1
-                    if credits["unparsedString"]:
-                        ordered_song["unparsedString"] = credits["unparsedString"]
-                
-                if credits["parsingUncertain"]:
-                    ordered_song["parsingUncertain"] = True
-                    stats["parsing_uncertain"] += 1
-                    if credits["unparsedString"]:
-                        ordered_song["unparsedString"] = credits["unparsedString"]
-            
-            # After "playback", insert isPrivate if it exists
-            elif key == "playback" and isPrivate_value is not None:
-                ordered_song["isPrivate"] = isPrivate_value
+        # Songs without a singer get no credit fields, so they are not counted
+        if "singer" in song:
+            if translators:
+                stats["with_translators"] += 1
+            if needs_review:
+                stats["needs_manual_review"] += 1
+            if uncertain:
+                stats["parsing_uncertain"] += 1
         
-        # Update the song dictionary
-        song.clear()
-        song.update(ordered_song)
+        for key in ("composers", "lyricists", "translators"):
+            song.pop(key, None)
+        insert_song_fields(song, credit_fields)
         
-        if credits["composers"] or credits["lyricists"]:
-            if not credits["needsManualReview"] and not credits["parsingUncertain"]:
-                stats["successfully_parsed"] += 1
+        if (composers or lyricists) and not needs_review and not uncertain:
+            stats["successfully_parsed"] += 1
     
     # Write output JSON with custom formatting (arrays as one-liners)
     print(f"\nWriting enriched data to {output_path}...")
     
-    # First, dump with standard indentation
-    json_str = json.dumps(data, ensure_ascii=False, indent="\t")
-    
-    # Post-process to format specific array fields as one-liners
-    # Match multi-line arrays for these specific fields
-    def compress_array(match):
-        field_name = match.group(1)
-        array_content = match.group(2)
-        # Remove newlines and extra whitespace from array content
-        array_items = re.findall(r'"([^"]*)"', array_content)
-        # Format as one-liner
-        one_liner = ', '.join([f'"{item}"' for item in array_items])
-        return f'"{field_name}": [{one_liner}]'
-    
-    # Pattern for composers, lyricists, translators, categoryIds arrays
-    pattern = r'"(composers|lyricists|translators|categoryIds)":\s*\[\s*((?:"[^"]*"\s*,?\s*)*)\s*\]'
-    json_str = re.sub(pattern, compress_array, json_str, flags=re.MULTILINE | re.DOTALL)
-    
+    # Shares the writer of apply_manual_reviews, which formats the arrays while
+    # serializing instead of rewriting the dumped text with a regex
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(json_str)
+        write_songs_json(data, f)
+    
+    # Songs left for manual review, which review_app.py loads instead of
+    # filtering the whole enriched file on every start
+    review_queue = [song for song in songs if song.get("needsManualReview")]
+    with open(Path(output_path).with_name(REVIEW_QUEUE_FILENAME), 'w', encoding='utf-8') as f:
+        write_songs_json({"songs": review_queue}, f)
     
     # Print statistics
     print("\n" + "="*60)
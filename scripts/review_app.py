@@ -3,54 +3,137 @@
 Flask web app for manually reviewing and editing song credits.
 """
 
-from flask import Flask, render_template, jsonify, request
-import json
+from flask import Flask, render_template, request
+import atexit
 import os
+import signal
+import sys
+import threading
 from pathlib import Path
 
+# Add the package to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from music_library_mcp._json import dumps_indented, dumps_sorted, load_json
+
 app = Flask(__name__)
 
 # Paths (script is in scripts/, data is in parent directory)
 SONGS_PATH = Path(__file__).parent.parent / "songs" / "songs_enriched.json"
 MANUAL_REVIEWS_PATH = Path(__file__).parent.parent / "songs" / "manual_reviews.json"
+# Songs needing manual review, written by enrich_songs.py next to SONGS_PATH
+REVIEW_QUEUE_PATH = Path(__file__).parent.parent / "songs" / "songs_review_queue.json"
 
 # Cache for songs data
 _songs_cache = None
+_songs_by_id = None
 _manual_reviews_cache = None
 
+# Saves are written once no edit has arrived for SAVE_DELAY seconds, so a
+# burst of edits shares one write
+SAVE_DELAY = 0.5
+_save_lock = threading.Lock()
+_save_timer = None
+
 
 def load_songs():
-    """Load songs from songs_enriched.json"""
-    global _songs_cache
+    """Load songs from songs_enriched.json, or its review queue when current"""
+    global _songs_cache, _songs_by_id
     if _songs_cache is None:
-        with open(SONGS_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # Filter only songs that need manual review
-            _songs_cache = [
-                song for song in data.get('songs', [])
-                if song.get('needsManualReview')
-            ]
+        # The queue holds only the songs to review; skip it if the enriched
+        # file was regenerated after it
+        path = SONGS_PATH
+        if REVIEW_QUEUE_PATH.exists() and (
+            not SONGS_PATH.exists()
+            or REVIEW_QUEUE_PATH.stat().st_mtime >= SONGS_PATH.stat().st_mtime
+        ):
+            path = REVIEW_QUEUE_PATH
+        data = load_json(path)
+        # Filter only songs that need manual review
+        _songs_cache = [
+            song for song in data.get('songs', [])
+            if song.get('needsManualReview')
+        ]
+        # Index by id for get_song; reversed so the first duplicate wins
+        _songs_by_id = {song['id']: song for song in reversed(_songs_cache)}
     return _songs_cache
 
 
+def find_song(song_id):
+    """Look up a song needing manual review by id"""
+    load_songs()
+    return _songs_by_id.get(song_id)
+
+
 def load_manual_reviews():
     """Load manual reviews from file"""
     global _manual_reviews_cache
     if _manual_reviews_cache is None:
         if MANUAL_REVIEWS_PATH.exists():
-            with open(MANUAL_REVIEWS_PATH, 'r', encoding='utf-8') as f:
-                _manual_reviews_cache = json.load(f)
+            _manual_reviews_cache = load_json(MANUAL_REVIEWS_PATH)
         else:
             _manual_reviews_cache = {}
     return _manual_reviews_cache
 
 
 def save_manual_reviews(reviews):
-    """Save manual reviews to file"""
-    global _manual_reviews_cache
-    _manual_reviews_cache = reviews
-    with open(MANUAL_REVIEWS_PATH, 'w', encoding='utf-8') as f:
-        json.dump(reviews, f, ensure_ascii=False, indent=2)
+    """Save manual reviews, (re)scheduling a write to file"""
+    global _manual_reviews_cache, _save_timer
+    with _save_lock:
+        _manual_reviews_cache = reviews
+        # Each edit pushes the write back, so it happens after the last edit
+        # of a burst
+        if _save_timer is not None:
+            _save_timer.cancel()
+        _save_timer = threading.Timer(SAVE_DELAY, flush_manual_reviews)
+        _save_timer.daemon = True
+        _save_timer.start()
+
+
+@atexit.register
+def flush_manual_reviews():
+    """Write pending manual reviews to file, replacing it atomically"""
+    global _save_timer
+    with _save_lock:
+        if _save_timer is None:
+            return
+        _save_timer.cancel()
+        _save_timer = None
+        # Copy so requests can keep updating the cache during the write
+        reviews = dict(_manual_reviews_cache)
+        
+        # Write to a temporary file and rename it over the reviews, so an
+        # interrupted write never leaves a truncated file behind
+        tmp_path = MANUAL_REVIEWS_PATH.with_name(MANUAL_REVIEWS_PATH.name + '.tmp')
+        try:
+            tmp_path.write_text(dumps_indented(reviews), encoding='utf-8')
+            os.replace(tmp_path, MANUAL_REVIEWS_PATH)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+
+def _flush_and_exit(signum, frame):
+    """Write pending manual reviews before exiting on SIGTERM"""
+    flush_manual_reviews()
+    sys.exit(0)
+
+
+# The timer thread is a daemon, so pending reviews are written on normal
+# exit (atexit) and on SIGTERM; signal handlers can only be set from the
+# main thread
+if threading.current_thread() is threading.main_thread():
+    signal.signal(signal.SIGTERM, _flush_and_exit)
+
+
+def json_response(data):
+    """Like jsonify, but serialized with orjson when it is installed"""
+    # jsonify sorts keys by default; keep the same output
+    return app.response_class(
+        dumps_sorted(data),
+        mimetype='application/json'
+    )
 
 
 @app.route('/')
@@ -89,38 +172,46 @@ def get_songs():
         
         result.append(song_data)
     
-    return jsonify(result)
+    return json_response(result)
 
 
 @app.route('/api/songs/<int:song_id>')
 def get_song(song_id):
     """Get specific song details"""
-    songs = load_songs()
+    song = find_song(song_id)
+    if song is None:
+        return json_response({'error': 'Song not found'}), 404
+    
     manual_reviews = load_manual_reviews()
+    song_data = {
+        'id': song['id'],
+        'name': song.get('name', ''),
+        'singer': song.get('singer', ''),
+        'unparsedString': song.get('unparsedString', ''),
+        'composers': song.get('composers', []),
+        'lyricists': song.get('lyricists', []),
+        'translators': song.get('translators', []),
+        'isReviewed': str(song_id) in manual_reviews
+    }
     
-    for song in songs:
-        if song['id'] == song_id:
-            song_data = {
-                'id': song['id'],
-                'name': song.get('name', ''),
-                'singer': song.get('singer', ''),
-                'unparsedString': song.get('unparsedString', ''),
-                'composers': song.get('composers', []),
-                'lyricists': song.get('lyricists', []),
-                'translators': song.get('translators', []),
-                'isReviewed': str(song_id) in manual_reviews
-            }
-            
-            # Override with manual review data if exists
-            if str(song_id) in manual_reviews:
-                review = manual_reviews[str(song_id)]
-                song_data['composers'] = review.get('composers', [])
-                song_data['lyricists'] = review.get('lyricists', [])
-                song_data['translators'] = review.get('translators', [])
-            
-            return jsonify(song_data)
+    # Override with manual review data if exists
+    if str(song_id) in manual_reviews:
+        review = manual_reviews[str(song_id)]
+        song_data['composers'] = review.get('composers', [])
+        song_data['lyricists'] = review.get('lyricists', [])
+        song_data['translators'] = review.get('translators', [])
     
-    return jsonify({'error': 'Song not found'}), 404
+    return json_response(song_data)
+
+
+def parse_names(value):
+    """Parse a list or comma-separated string of names into a list"""
+    if isinstance(value, str):
+        value = value.split(',')
+    elif not isinstance(value, list):
+        return []
+    names = (name.strip() for name in value)
+    return [name for name in names if name]
 
 
 @app.route('/api/songs/<int:song_id>', methods=['POST'])
@@ -129,14 +220,6 @@ def save_song(song_id):
     data = request.json
     manual_reviews = load_manual_reviews()
     
-    # Parse comma-separated strings into arrays
-    def parse_names(value):
-        if isinstance(value, list):
-            return [name.strip() for name in value if name.strip()]
-        if isinstance(value, str):
-            return [name.strip() for name in value.split(',') if name.strip()]
-        return []
-    
     manual_reviews[str(song_id)] = {
         'composers': parse_names(data.get('composers', [])),
         'lyricists': parse_names(data.get('lyricists', [])),
@@ -145,7 +228,7 @@ def save_song(song_id):
     
     save_manual_reviews(manual_reviews)
     
-    return jsonify({'success': True, 'message': 'Song saved successfully'})
+    return json_response({'success': True, 'message': 'Song saved successfully'})
 
 
 @app.route('/api/stats')
@@ -157,7 +240,7 @@ def get_stats():
     total = len(songs)
     reviewed = len(manual_reviews)
     
-    return jsonify({
+    return json_response({
         'total': total,
         'reviewed': reviewed,
         'remaining': total - reviewed,
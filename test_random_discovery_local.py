@@ -1,258 +1,303 @@
 #!/usr/bin/env python3
 """Test the random discovery functionality with local data."""
 
-import json
+import ast
 import sys
+from functools import lru_cache
 from pathlib import Path
 
-# Add the package to path
-sys.path.insert(0, str(Path(__file__).parent))
+# Sources under test, relative to this script rather than the working directory.
+# They are only parsed, never imported, so these checks need no song data.
+DATABASE_SOURCE = str(Path(__file__).parent / 'music_library_mcp' / 'database.py')
+SERVER_SOURCE = str(Path(__file__).parent / 'music_library_mcp' / 'server.py')
 
-print("🔍 Testing Random Discovery Feature (Syntax Check)\n")
-print("=" * 60)
+# Expected get_random_discovery parameters, as written in the signature
+EXPECTED_PARAMS = ("language: str = 'both'", 'count: int = 10')
 
-# Test 1: Check database.py syntax
-print("\n✓ TEST 1: Checking database.py syntax...")
-try:
-    with open('music_library_mcp/database.py', 'r') as f:
-        code = f.read()
+# Keys get_random_discovery must (and must not) return
+REQUIRED_RETURN_KEYS = ('language_filter', 'songs', 'artists', 'composers', 'lyricists', 'counts')
+FORBIDDEN_RETURN_KEYS = ('translators',)
+
+
+@lru_cache(maxsize=None)
+def load_tree(path):
+    """Parse a source file once; the checks below query its syntax tree."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return ast.parse(f.read(), filename=path)
+
+
+def find_functions(tree):
+    """Map function names to their definitions."""
+    return {
+        node.name: node for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+
+
+def has_call(tree, func, **keywords):
+    """
+    Check for a call to func (as written, or ".name" for any object's
+    method) passing the given keyword sources.
+    """
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        if func.startswith('.'):
+            matched = isinstance(node.func, ast.Attribute) and node.func.attr == func[1:]
+        else:
+            matched = ast.unparse(node.func) == func
+        if matched:
+            passed = {kw.arg: ast.unparse(kw.value) for kw in node.keywords}
+            if all(passed.get(name) == value for name, value in keywords.items()):
+                return True
+    return False
+
+
+def find_comparisons(tree):
+    """Source of every comparison, e.g. "language.lower() == 'hebrew'"."""
+    return {ast.unparse(node) for node in ast.walk(tree) if isinstance(node, ast.Compare)}
+
+
+def find_loops(tree):
+    """Source of every for loop header, e.g. "artist in artists[:50]"."""
+    return {
+        f"{ast.unparse(node.target)} in {ast.unparse(node.iter)}"
+        for node in ast.walk(tree) if isinstance(node, (ast.For, ast.AsyncFor))
+    }
+
+
+def find_products(tree):
+    """Source of every multiplication, e.g. "artist_fame * 0.6"."""
+    return {
+        ast.unparse(node) for node in ast.walk(tree)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult)
+    }
+
+
+def dict_keys(node):
+    """String keys of every dict literal under node."""
+    return {
+        key.value for child in ast.walk(node) if isinstance(child, ast.Dict)
+        for key in child.keys
+        if isinstance(key, ast.Constant) and isinstance(key.value, str)
+    }
+
+
+def check(failures, condition, passed, failed):
+    """Print the outcome of one check, recording it in failures if it did not hold."""
+    if condition:
+        print(f"  ✓ {passed}")
+    else:
+        print(f"  ✗ {failed}")
+        failures.append(failed)
+
+
+def test_database_syntax():
+    """TEST 1: Check database.py syntax."""
+    failures = []
+    tree = load_tree(DATABASE_SOURCE)
+    functions = find_functions(tree)
+    comparisons = find_comparisons(tree)
     
     # Check that the method exists
-    if 'def get_random_discovery(' in code:
-        print("  ✓ get_random_discovery method found")
-    else:
-        print("  ✗ get_random_discovery method not found")
-        sys.exit(1)
+    check(failures, 'get_random_discovery' in functions,
+          "get_random_discovery method found",
+          "get_random_discovery method not found")
     
     # Check for language filtering logic
-    if 'language.lower() == "hebrew"' in code:
-        print("  ✓ Hebrew language filter found")
-    else:
-        print("  ✗ Hebrew language filter not found")
-        sys.exit(1)
-    
-    if 'language.lower() == "english"' in code:
-        print("  ✓ English language filter found")
-    else:
-        print("  ✗ English language filter not found")
-        sys.exit(1)
+    check(failures, "language.lower() == 'hebrew'" in comparisons,
+          "Hebrew language filter found",
+          "Hebrew language filter not found")
+    check(failures, "language.lower() == 'english'" in comparisons,
+          "English language filter found",
+          "English language filter not found")
     
     # Check for random sampling
-    if 'random.sample' in code:
-        print("  ✓ Random sampling implementation found")
-    else:
-        print("  ✗ Random sampling not found")
-        sys.exit(1)
+    check(failures, has_call(tree, 'random.sample'),
+          "Random sampling implementation found",
+          "Random sampling not found")
     
+    assert not failures, "\n".join(failures)
     print("  ✓ All database checks passed!")
-    
-except Exception as e:
-    print(f"  ✗ Error reading database.py: {e}")
-    sys.exit(1)
-
-# Test 2: Check server.py changes
-print("\n✓ TEST 2: Checking server.py changes...")
-try:
-    with open('music_library_mcp/server.py', 'r') as f:
-        code = f.read()
+
+
+def test_server_changes():
+    """TEST 2: Check server.py changes."""
+    failures = []
+    tree = load_tree(SERVER_SOURCE)
+    loops = find_loops(tree)
     
     # Check that dynamic resources were removed
-    if 'for artist in artists[:50]:' in code:
-        print("  ✗ ERROR: Artist dynamic resources still present!")
-        sys.exit(1)
-    else:
-        print("  ✓ Artist dynamic resources removed")
-    
-    if 'for composer in composers[:50]:' in code:
-        print("  ✗ ERROR: Composer dynamic resources still present!")
-        sys.exit(1)
-    else:
-        print("  ✓ Composer dynamic resources removed")
-    
-    if 'for lyricist in lyricists[:50]:' in code:
-        print("  ✗ ERROR: Lyricist dynamic resources still present!")
-        sys.exit(1)
-    else:
-        print("  ✓ Lyricist dynamic resources removed")
-    
-    if 'for translator in translators[:50]:' in code:
-        print("  ✗ ERROR: Translator dynamic resources still present!")
-        sys.exit(1)
-    else:
-        print("  ✓ Translator dynamic resources removed")
+    check(failures, 'artist in artists[:50]' not in loops,
+          "Artist dynamic resources removed",
+          "ERROR: Artist dynamic resources still present!")
+    check(failures, 'composer in composers[:50]' not in loops,
+          "Composer dynamic resources removed",
+          "ERROR: Composer dynamic resources still present!")
+    check(failures, 'lyricist in lyricists[:50]' not in loops,
+          "Lyricist dynamic resources removed",
+          "ERROR: Lyricist dynamic resources still present!")
+    check(failures, 'translator in translators[:50]' not in loops,
+          "Translator dynamic resources removed",
+          "ERROR: Translator dynamic resources still present!")
     
     # Check that collaborations are limited to 10
-    if 'db.get_all_collaborations(limit=10)' in code:
-        print("  ✓ Collaborations limited to 10")
-    else:
-        print("  ✗ Collaborations not limited to 10")
-        sys.exit(1)
+    check(failures, has_call(tree, 'db.get_all_collaborations', limit='10'),
+          "Collaborations limited to 10",
+          "Collaborations not limited to 10")
     
     # Check that the new tool was added
-    if 'name="get_random_discovery"' in code:
-        print("  ✓ get_random_discovery tool definition found")
-    else:
-        print("  ✗ get_random_discovery tool definition not found")
-        sys.exit(1)
+    check(failures, has_call(tree, 'Tool', name="'get_random_discovery'"),
+          "get_random_discovery tool definition found",
+          "get_random_discovery tool definition not found")
     
     # Check tool handler
-    if 'elif name == "get_random_discovery":' in code:
-        print("  ✓ get_random_discovery tool handler found")
-    else:
-        print("  ✗ get_random_discovery tool handler not found")
-        sys.exit(1)
+    check(failures, "name == 'get_random_discovery'" in find_comparisons(tree),
+          "get_random_discovery tool handler found",
+          "get_random_discovery tool handler not found")
     
     # Check tool calls db method
-    if 'db.get_random_discovery(language=language, count=count)' in code:
-        print("  ✓ Tool handler calls database method correctly")
-    else:
-        print("  ✗ Tool handler doesn't call database method")
-        sys.exit(1)
+    check(failures, has_call(tree, 'db.get_random_discovery', language='language', count='count'),
+          "Tool handler calls database method correctly",
+          "Tool handler doesn't call database method")
     
+    assert not failures, "\n".join(failures)
     print("  ✓ All server checks passed!")
-    
-except Exception as e:
-    print(f"  ✗ Error reading server.py: {e}")
-    sys.exit(1)
-
-# Test 3: Check method signature
-print("\n✓ TEST 3: Validating method signature...")
-try:
-    expected_params = ['language: str = "both"', 'count: int = 10']
-    
-    with open('music_library_mcp/database.py', 'r') as f:
-        code = f.read()
-    
-    for param in expected_params:
-        if param in code:
-            print(f"  ✓ Parameter '{param}' found")
-        else:
-            print(f"  ✗ Parameter '{param}' not found")
-            sys.exit(1)
-    
+
+
+def test_method_signature():
+    """TEST 3: Validate method signature."""
+    failures = []
+    method = find_functions(load_tree(DATABASE_SOURCE))['get_random_discovery']
+    args = method.args.args
+    defaults = [None] * (len(args) - len(method.args.defaults)) + method.args.defaults
+    params = {
+        f"{arg.arg}: {ast.unparse(arg.annotation)} = {ast.unparse(default)}"
+        for arg, default in zip(args, defaults)
+        if arg.annotation is not None and default is not None
+    }
+    
+    for param in EXPECTED_PARAMS:
+        check(failures, param in params,
+              f'Parameter "{param}" found',
+              f'Parameter "{param}" not found')
+    
+    assert not failures, "\n".join(failures)
     print("  ✓ Method signature is correct!")
-    
-except Exception as e:
-    print(f"  ✗ Error: {e}")
-    sys.exit(1)
-
-# Test 4: Check return structure
-print("\n✓ TEST 4: Validating return structure...")
-try:
-    with open('music_library_mcp/database.py', 'r') as f:
-        code = f.read()
-    
-    required_keys = [
-        "'language_filter'",
-        "'songs'",
-        "'artists'",
-        "'composers'",
-        "'lyricists'",
-        "'counts'"
-    ]
-    
-    # Keys that should NOT be present
-    forbidden_keys = ["'translators'"]
-    
-    for key in required_keys:
-        if key in code:
-            print(f"  ✓ Return key {key} found")
-        else:
-            print(f"  ✗ Return key {key} not found")
-            sys.exit(1)
+
+
+def test_return_structure():
+    """TEST 4: Validate return structure."""
+    failures = []
+    method = find_functions(load_tree(DATABASE_SOURCE))['get_random_discovery']
+    
+    # Keys of the dicts returned by get_random_discovery
+    return_keys = set()
+    for node in ast.walk(method):
+        if isinstance(node, ast.Return) and node.value is not None:
+            return_keys |= dict_keys(node.value)
+    
+    for key in REQUIRED_RETURN_KEYS:
+        check(failures, key in return_keys,
+              f"Return key '{key}' found",
+              f"Return key '{key}' not found")
     
     # Check that translators are NOT in the get_random_discovery return
-    # Extract just the get_random_discovery method
-    method_start = code.find('def get_random_discovery(')
-    if method_start != -1:
-        # Find the next method definition or end of class
-        next_method = code.find('\n    def ', method_start + 1)
-        if next_method == -1:
-            method_code = code[method_start:]
-        else:
-            method_code = code[method_start:next_method]
-        
-        # Check that translators are not in the return statement of this method
-        if "'translators'" in method_code:
-            print("  ✗ Translators still in get_random_discovery return structure")
-            sys.exit(1)
-        else:
-            print("  ✓ Translators removed from get_random_discovery")
+    check(failures, not any(key in return_keys for key in FORBIDDEN_RETURN_KEYS),
+          "Translators removed from get_random_discovery",
+          "Translators still in get_random_discovery return structure")
     
+    assert not failures, "\n".join(failures)
     print("  ✓ Return structure is correct!")
-    
-except Exception as e:
-    print(f"  ✗ Error: {e}")
-    sys.exit(1)
-
-# Test 5: Check fame score implementation
-print("\n✓ TEST 5: Validating fame score implementation...")
-try:
-    with open('music_library_mcp/database.py', 'r') as f:
-        code = f.read()
+
+
+def test_fame_score():
+    """TEST 5: Validate fame score implementation."""
+    failures = []
+    tree = load_tree(DATABASE_SOURCE)
+    products = find_products(tree)
     
     # Check for fame rank calculation method
-    if 'def _calculate_fame_rank(' in code:
-        print("  ✓ Fame rank calculation method found")
-    else:
-        print("  ✗ Fame rank calculation method not found")
-        sys.exit(1)
+    check(failures, '_calculate_fame_rank' in find_functions(tree),
+          "Fame rank calculation method found",
+          "Fame rank calculation method not found")
     
     # Check for fame score in return values
-    if "'fame_score'" in code:
-        print("  ✓ Fame score in return structure")
-    else:
-        print("  ✗ Fame score not in return structure")
-        sys.exit(1)
+    check(failures, 'fame_score' in dict_keys(tree),
+          "Fame score in return structure",
+          "Fame score not in return structure")
     
     # Check for sorting by fame score
-    if 'sort(key=lambda x: x[\'fame_score\'], reverse=True)' in code:
-        print("  ✓ Results sorted by fame score (descending)")
-    else:
-        print("  ✗ Results not sorted by fame score")
-        sys.exit(1)
+    check(failures, has_call(tree, '.sort', key="lambda x: x['fame_score']", reverse='True'),
+          "Results sorted by fame score (descending)",
+          "Results not sorted by fame score")
     
     # Check for composite score calculation (artist weight)
-    if 'artist_fame * 0.6' in code:
-        print("  ✓ Composite score with artist weight (0.6) found")
-    else:
-        print("  ✗ Composite score with artist weight not found")
-        sys.exit(1)
+    check(failures, 'artist_fame * 0.6' in products,
+          "Composite score with artist weight (0.6) found",
+          "Composite score with artist weight not found")
     
     # Check for composer weight
-    if 'avg_composer_fame * 0.25' in code:
-        print("  ✓ Composite score with composer weight (0.25) found")
-    else:
-        print("  ✗ Composite score with composer weight not found")
-        sys.exit(1)
+    check(failures, 'avg_composer_fame * 0.25' in products,
+          "Composite score with composer weight (0.25) found",
+          "Composite score with composer weight not found")
     
     # Check for lyricist weight
-    if 'avg_lyricist_fame * 0.15' in code:
-        print("  ✓ Composite score with lyricist weight (0.15) found")
-    else:
-        print("  ✗ Composite score with lyricist weight not found")
-        sys.exit(1)
+    check(failures, 'avg_lyricist_fame * 0.15' in products,
+          "Composite score with lyricist weight (0.15) found",
+          "Composite score with lyricist weight not found")
     
+    assert not failures, "\n".join(failures)
     print("  ✓ Fame score implementation is correct!")
-    
-except Exception as e:
-    print(f"  ✗ Error: {e}")
-    sys.exit(1)
-
-print("\n" + "=" * 60)
-print("\n✅ All validation tests passed!")
-print("\n📋 Summary of changes:")
-print("  ✓ Removed ~190 dynamic resources (artists, composers, lyricists, translators)")
-print("  ✓ Reduced collaboration resources from 30 to 10")
-print("  ✓ Added get_random_discovery() method to database")
-print("  ✓ Added get_random_discovery tool to MCP server")
-print("  ✓ Implemented language filtering (hebrew/english/both)")
-print("  ✓ Added fame scores (0-100 rank) for all results")
-print("  ✓ Songs get composite fame scores (artist 60%, composer 25%, lyricist 15%)")
-print("  ✓ Results sorted by fame score (most famous first)")
-print("  ✓ Removed all translator functionality")
-print("\n💡 To test with actual data, install dependencies:")
-print("   pip install -r requirements.txt")
-print("   python3 test_random_discovery.py")
-print()
 
+
+TESTS = (
+    ("Checking database.py syntax", test_database_syntax),
+    ("Checking server.py changes", test_server_changes),
+    ("Validating method signature", test_method_signature),
+    ("Validating return structure", test_return_structure),
+    ("Validating fame score implementation", test_fame_score),
+)
+
+
+def main():
+    print("🔍 Testing Random Discovery Feature (Syntax Check)\n")
+    print("=" * 60)
+    
+    # Run every test, so one run reports all failing checks
+    failures = []
+    for number, (title, test) in enumerate(TESTS, 1):
+        print(f"\n✓ TEST {number}: {title}...")
+        try:
+            test()
+        except AssertionError as e:
+            failures.extend(f"TEST {number}: {failed}" for failed in str(e).splitlines())
+        except Exception as e:
+            print(f"  ✗ Error: {e}")
+            failures.append(f"TEST {number}: Error: {e}")
+    
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"\n❌ {len(failures)} check(s) failed:")
+        for failure in failures:
+            print(f"  ✗ {failure}")
+        sys.exit(1)
+    print("\n✅ All validation tests passed!")
+    print("\n📋 Summary of changes:")
+    print("  ✓ Removed ~190 dynamic resources (artists, composers, lyricists, translators)")
+    print("  ✓ Reduced collaboration resources from 30 to 10")
+    print("  ✓ Added get_random_discovery() method to database")
+    print("  ✓ Added get_random_discovery tool to MCP server")
+    print("  ✓ Implemented language filtering (hebrew/english/both)")
+    print("  ✓ Added fame scores (0-100 rank) for all results")
+    print("  ✓ Songs get composite fame scores (artist 60%, composer 25%, lyricist 15%)")
+    print("  ✓ Results sorted by fame score (most famous first)")
+    print("  ✓ Removed all translator functionality")
+    print("\n💡 To test with actual data, install dependencies:")
+    print("   pip install -r requirements.txt")
+    print("   python3 test_random_discovery.py")
+    print()
+
+
+if __name__ == "__main__":
+    main()
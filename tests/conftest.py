@@ -0,0 +1,53 @@
+"""Shared fixtures for the test scripts."""
+
+from pathlib import Path
+
+import httpx
+import pytest
+
+from music_library_mcp.database import SongsDatabase
+
+SONGS_PATH = Path(__file__).parent.parent / "songs" / "songs_enriched.json"
+# Small library committed with the tests, for checks that must always run
+LIBRARY_PATH = Path(__file__).parent / "fixtures" / "songs.json"
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """An empty cache directory used in place of ~/.cache/music-library-mcp."""
+    path = tmp_path / "cache"
+    monkeypatch.setenv("MUSIC_LIBRARY_MCP_CACHE_DIR", str(path))
+    return path
+
+
+@pytest.fixture(scope="session")
+def library():
+    """The committed test library, indexed without the index cache."""
+    return SongsDatabase(LIBRARY_PATH, index_cache=False)
+
+
+@pytest.fixture(scope="session")
+def db():
+    """The enriched song library, loaded and indexed once per test session."""
+    if not SONGS_PATH.exists():
+        pytest.skip(f"Database file not found at {SONGS_PATH}")
+    return SongsDatabase(SONGS_PATH)
+
+
+@pytest.fixture(scope="session")
+def server(tmp_path_factory):
+    """The MCP server module, imported with an empty library served locally.
+
+    The server loads its library from the remote index at import, so the
+    shared HTTP client is replaced while importing it.
+    """
+    pytest.importorskip("mcp")
+
+    def serve_library(request):
+        return httpx.Response(200, json={"songs": [], "categories": []})
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("MUSIC_LIBRARY_MCP_CACHE_DIR", str(tmp_path_factory.mktemp("server-cache")))
+        mp.setattr(SongsDatabase, "_http_client", httpx.Client(transport=httpx.MockTransport(serve_library)))
+        from music_library_mcp import server
+    return server
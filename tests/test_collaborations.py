@@ -1,13 +1,10 @@
 #!/usr/bin/env python3
 """Test script to demonstrate the new collaboration cache features."""
 
-from music_library_mcp.database import SongsDatabase
+import pytest
 
-def main():
-    # Initialize database
-    print("Initializing database with songs_enriched.json...")
-    db = SongsDatabase('songs/songs_enriched.json')
-    
+
+def test_collaborations(db):
     print("\n" + "="*80)
     print("COLLABORATION CACHE STATISTICS")
     print("="*80)
@@ -27,7 +24,7 @@ def main():
         comp = collab['composer']
         count = collab['song_count']
         
-        if lyr.lower().strip() == comp.lower().strip():
+        if collab['is_self_collab']:
             # Self-collaboration
             print(f"{i:2}. {lyr:40} (SELF) → {count:3} songs")
         else:
@@ -38,7 +35,7 @@ def main():
     print("SELF-COLLABORATIONS (Artists who write both lyrics and music)")
     print("="*80)
     all_collabs = db.get_all_collaborations()
-    self_collabs = [c for c in all_collabs if c['lyricist'].lower().strip() == c['composer'].lower().strip()]
+    self_collabs = [c for c in all_collabs if c['is_self_collab']]
     print(f"Found {len(self_collabs)} self-collaborations")
     print("\nTop 10 self-collaborators:")
     for i, collab in enumerate(self_collabs[:10], 1):
@@ -77,8 +74,7 @@ def main():
     print(f"אהוד מנור worked with {len(collabs)} different composers")
     print("\nTop 10 composer collaborations:")
     for i, collab in enumerate(collabs[:10], 1):
-        is_self = collab['lyricist'].lower().strip() == collab['composer'].lower().strip()
-        marker = "(self)" if is_self else ""
+        marker = "(self)" if collab['is_self_collab'] else ""
         print(f"{i:2}. {collab['composer']:40} {marker:7} {collab['song_count']:2} songs")
     
     print("\n" + "="*80)
@@ -88,46 +84,54 @@ def main():
     print(f"מתי כספי worked with {len(collabs)} different lyricists")
     print("\nTop 10 lyricist collaborations:")
     for i, collab in enumerate(collabs[:10], 1):
-        is_self = collab['lyricist'].lower().strip() == collab['composer'].lower().strip()
-        marker = "(self)" if is_self else ""
+        marker = "(self)" if collab['is_self_collab'] else ""
         print(f"{i:2}. {collab['lyricist']:40} {marker:7} {collab['song_count']:2} songs")
     
     print("\n" + "="*80)
     print("CARTESIAN PRODUCT EXAMPLE")
     print("="*80)
     print("Finding a song with multiple lyricists and composers...")
-    for song in db.songs:
-        lyricists = song.get('lyricists', [])
-        composers = song.get('composers', [])
-        if len(lyricists) >= 2 and len(composers) >= 2:
-            print(f"\nSong: {song['name']}")
-            print(f"Lyricists: {', '.join(lyricists)}")
-            print(f"Composers: {', '.join(composers)}")
-            print(f"\nThis creates {len(lyricists)} × {len(composers)} = {len(lyricists) * len(composers)} collaboration entries:")
-            for lyr in lyricists:
-                for comp in composers:
-                    print(f"  - {lyr} × {comp}")
-            break
+    song = next(
+        (s for s in db.songs
+         if len(s.get('lyricists') or ()) >= 2 and len(s.get('composers') or ()) >= 2),
+        None)
+    if song:
+        lyricists = song['lyricists']
+        composers = song['composers']
+        print(f"\nSong: {song['name']}")
+        print(f"Lyricists: {', '.join(lyricists)}")
+        print(f"Composers: {', '.join(composers)}")
+        print(f"\nThis creates {len(lyricists)} × {len(composers)} = {len(lyricists) * len(composers)} collaboration entries:")
+        for lyr in lyricists:
+            for comp in composers:
+                print(f"  - {lyr} × {comp}")
     
     print("\n" + "="*80)
     print("INTERESTING INSIGHTS")
     print("="*80)
     
-    # Find collaborations with exactly 1 song (rare collaborations)
-    rare_collabs = [c for c in all_collabs if c['song_count'] == 1]
-    prolific_collabs = [c for c in all_collabs if c['song_count'] >= 10]
-    true_collabs = [c for c in all_collabs if c['lyricist'].lower().strip() != c['composer'].lower().strip()]
+    # Count rare (exactly 1 song), prolific and true collaborations in one pass
+    rare_count = prolific_count = true_count = total_songs = 0
+    for c in all_collabs:
+        song_count = c['song_count']
+        total_songs += song_count
+        if song_count == 1:
+            rare_count += 1
+        elif song_count >= 10:
+            prolific_count += 1
+        if not c['is_self_collab']:
+            true_count += 1
     
-    print(f"Rare collaborations (1 song): {len(rare_collabs):,}")
-    print(f"Prolific collaborations (10+ songs): {len(prolific_collabs):,}")
-    print(f"True collaborations (different people): {len(true_collabs):,}")
+    print(f"Rare collaborations (1 song): {rare_count:,}")
+    print(f"Prolific collaborations (10+ songs): {prolific_count:,}")
+    print(f"True collaborations (different people): {true_count:,}")
     print(f"Self-collaborations (same person): {len(self_collabs):,}")
-    print(f"\nAverage songs per collaboration: {sum(c['song_count'] for c in all_collabs) / len(all_collabs):.2f}")
+    print(f"\nAverage songs per collaboration: {total_songs / len(all_collabs):.2f}")
     
     print("\n" + "="*80)
     print("✅ ALL COLLABORATION TESTS COMPLETED SUCCESSFULLY!")
     print("="*80)
 
 if __name__ == "__main__":
-    main()
+    pytest.main([__file__, "-s"])
 
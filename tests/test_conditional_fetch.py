@@ -0,0 +1,107 @@
+"""Tests for revalidating URL sources with conditional GETs."""
+
+import json
+
+import httpx
+import pytest
+
+from conftest import LIBRARY_PATH
+from music_library_mcp.database import SongsDatabase
+
+URL = "https://example.com/songs.json"
+ETAG = '"v1"'
+LAST_MODIFIED = "Wed, 14 Oct 2026 07:00:00 GMT"
+
+
+@pytest.fixture
+def songs_host(cache_dir, monkeypatch):
+    """A songs host answering 304 to requests that carry its current ETag."""
+    host = {"body": LIBRARY_PATH.read_bytes(), "etag": ETAG, "requests": []}
+
+    def handler(request):
+        host["requests"].append(request)
+        if request.headers.get("If-None-Match") == host["etag"]:
+            return httpx.Response(304)
+        return httpx.Response(
+            200, content=host["body"],
+            headers={"ETag": host["etag"], "Last-Modified": LAST_MODIFIED},
+        )
+
+    monkeypatch.setattr(SongsDatabase, "_http_client", httpx.Client(transport=httpx.MockTransport(handler)))
+    return host
+
+
+def cached_files(cache_dir):
+    """Paths of the downloaded copy and of its validators."""
+    (meta_path,) = cache_dir.glob("*.meta.json")
+    return meta_path.with_name(meta_path.name.replace(".meta.json", ".json")), meta_path
+
+
+def test_first_load_saves_copy_and_validators(songs_host, cache_dir):
+    db = SongsDatabase(URL)
+
+    (request,) = songs_host["requests"]
+    assert "If-None-Match" not in request.headers
+    assert "If-Modified-Since" not in request.headers
+    assert len(db.songs) == len(json.loads(songs_host["body"])["songs"])
+
+    body_path, meta_path = cached_files(cache_dir)
+    assert body_path.read_bytes() == songs_host["body"]
+    assert json.loads(meta_path.read_text(encoding="utf-8")) == {
+        "url": URL, "etag": ETAG, "last_modified": LAST_MODIFIED,
+    }
+
+
+def test_not_modified_uses_local_copy(songs_host, monkeypatch):
+    first = SongsDatabase(URL)
+
+    def fail(self):
+        raise AssertionError("an unchanged library was re-indexed")
+    monkeypatch.setattr(SongsDatabase, "_build_indexes", fail)
+    second = SongsDatabase(URL)
+
+    request = songs_host["requests"][-1]
+    assert request.headers["If-None-Match"] == ETAG
+    assert request.headers["If-Modified-Since"] == LAST_MODIFIED
+    assert second.songs == first.songs
+    assert second.get_stats() == first.get_stats()
+
+
+def test_changed_library_is_downloaded(songs_host, cache_dir):
+    SongsDatabase(URL)
+    library = json.loads(songs_host["body"])
+    library["songs"] = library["songs"][:3]
+    songs_host["body"] = json.dumps(library).encode("utf-8")
+    songs_host["etag"] = '"v2"'
+
+    db = SongsDatabase(URL)
+    assert len(db.songs) == 3
+    body_path, meta_path = cached_files(cache_dir)
+    assert body_path.read_bytes() == songs_host["body"]
+    assert json.loads(meta_path.read_text(encoding="utf-8"))["etag"] == '"v2"'
+
+
+@pytest.mark.parametrize("sidecar", [None, "{not json"])
+def test_missing_or_corrupt_sidecar_refetches(songs_host, cache_dir, sidecar):
+    SongsDatabase(URL)
+    body_path, meta_path = cached_files(cache_dir)
+    if sidecar is None:
+        meta_path.unlink()
+    else:
+        meta_path.write_text(sidecar, encoding="utf-8")
+
+    db = SongsDatabase(URL)
+    request = songs_host["requests"][-1]
+    assert "If-None-Match" not in request.headers
+    assert "If-Modified-Since" not in request.headers
+    assert len(db.songs) == len(json.loads(songs_host["body"])["songs"])
+    assert json.loads(meta_path.read_text(encoding="utf-8"))["etag"] == ETAG
+
+
+def test_server_error_is_raised(songs_host, monkeypatch):
+    monkeypatch.setattr(
+        SongsDatabase, "_http_client",
+        httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(503))),
+    )
+    with pytest.raises(httpx.HTTPStatusError):
+        SongsDatabase(URL)
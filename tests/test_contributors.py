@@ -1,13 +1,12 @@
 #!/usr/bin/env python3
 """Test script to demonstrate the new contributors functionality."""
 
-from music_library_mcp.database import SongsDatabase
+import heapq
 
-def main():
-    # Initialize database
-    print("Initializing database with songs_enriched.json...")
-    db = SongsDatabase('songs/songs_enriched.json')
-    
+import pytest
+
+
+def test_contributors(db):
     print("\n" + "="*70)
     print("DATABASE STATISTICS")
     print("="*70)
@@ -22,14 +21,14 @@ def main():
     print("\n" + "="*70)
     print("TOP 10 COMPOSERS BY SONG COUNT")
     print("="*70)
-    composers = sorted(db.get_all_composers(), key=lambda x: x['song_count'], reverse=True)[:10]
+    composers = heapq.nlargest(10, db.get_all_composers(), key=lambda x: x['song_count'])
     for i, composer in enumerate(composers, 1):
         print(f"{i:2}. {composer['name']:40} {composer['song_count']:3} songs")
     
     print("\n" + "="*70)
     print("TOP 10 LYRICISTS BY SONG COUNT")
     print("="*70)
-    lyricists = sorted(db.get_all_lyricists(), key=lambda x: x['song_count'], reverse=True)[:10]
+    lyricists = heapq.nlargest(10, db.get_all_lyricists(), key=lambda x: x['song_count'])
     for i, lyricist in enumerate(lyricists, 1):
         print(f"{i:2}. {lyricist['name']:40} {lyricist['song_count']:3} songs")
     
@@ -84,5 +83,5 @@ def main():
     print("="*70)
 
 if __name__ == "__main__":
-    main()
+    pytest.main([__file__, "-s"])
 
@@ -0,0 +1,111 @@
+"""Tests for the index cache of local JSON sources."""
+
+import json
+import sys
+
+import pytest
+
+from music_library_mcp.database import SongsDatabase
+
+LIBRARY = {
+    "version": "1",
+    "title": "Index cache test library",
+    "categories": [{"id": "1", "name": "עברית"}],
+    "songs": [
+        {"id": 1, "name": "ירושלים של זהב", "singer": "שולי נתן",
+         "composers": ["נעמי שמר"], "lyricists": ["נעמי שמר"], "categoryIds": ["1"]},
+        {"id": 2, "name": "לו יהי", "singer": "חוה אלברשטיין",
+         "composers": ["נעמי שמר"], "lyricists": ["נעמי שמר"], "categoryIds": ["1"]},
+    ],
+}
+
+
+@pytest.fixture
+def songs_path(tmp_path, cache_dir):
+    path = tmp_path / "songs.json"
+    path.write_text(json.dumps(LIBRARY, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def forbid_rebuild(monkeypatch):
+    """Make any fresh index build fail the test."""
+    def fail(self):
+        raise AssertionError("indexes were rebuilt instead of loaded from the cache")
+    monkeypatch.setattr(SongsDatabase, "_build_indexes", fail)
+
+
+def test_cache_written_to_cache_dir(songs_path, cache_dir):
+    SongsDatabase(songs_path)
+    assert [p.name for p in songs_path.parent.iterdir()] == ["cache", "songs.json"]
+    assert len(list((cache_dir / "indexes").glob("*.idx.pkl"))) == 1
+
+
+def test_round_trip(songs_path, monkeypatch):
+    built = SongsDatabase(songs_path)
+    forbid_rebuild(monkeypatch)
+    loaded = SongsDatabase(songs_path)
+
+    assert loaded.songs == built.songs
+    assert loaded.get_all_composers() == built.get_all_composers()
+    assert loaded.search_songs(query="זהב") == built.search_songs(query="זהב")
+    assert loaded.get_stats() == built.get_stats()
+
+
+def test_loaded_names_are_interned(songs_path):
+    SongsDatabase(songs_path)
+    loaded = SongsDatabase(songs_path)
+
+    key = next(iter(loaded.songs_by_composer))
+    assert key is sys.intern(key)
+    assert loaded._normalize_key("נעמי שמר") is key
+    assert loaded.songs[0]["singer"] is sys.intern("שולי נתן")
+    assert loaded.songs[0]["composers"][0] is loaded.songs[1]["composers"][0]
+
+
+def test_changed_source_is_rebuilt(songs_path):
+    SongsDatabase(songs_path)
+    library = dict(LIBRARY, songs=LIBRARY["songs"][:1])
+    songs_path.write_text(json.dumps(library, ensure_ascii=False), encoding="utf-8")
+
+    assert len(SongsDatabase(songs_path).songs) == 1
+
+
+def test_other_cache_format_is_rebuilt(songs_path, monkeypatch):
+    SongsDatabase(songs_path)
+    monkeypatch.setattr(SongsDatabase, "_INDEXED_ATTRIBUTES", SongsDatabase._INDEXED_ATTRIBUTES[:-1])
+    monkeypatch.setattr(SongsDatabase, "_index_cache_format_digest", None)
+
+    rebuilt = []
+    build_indexes = SongsDatabase._build_indexes
+    def record(self):
+        rebuilt.append(self)
+        build_indexes(self)
+    monkeypatch.setattr(SongsDatabase, "_build_indexes", record)
+
+    SongsDatabase(songs_path)
+    assert rebuilt
+
+
+def test_indexed_attributes_are_complete(songs_path, tmp_path):
+    """Every attribute filled while loading must be saved to the cache."""
+    empty_path = tmp_path / "empty.json"
+    empty_path.write_text('{"songs": [], "categories": []}', encoding="utf-8")
+    empty = vars(SongsDatabase(empty_path, index_cache=False))
+    full = vars(SongsDatabase(songs_path, index_cache=False))
+
+    filled = {name for name, value in full.items() if value != empty[name]}
+    filled.discard("json_source")
+    assert filled <= set(SongsDatabase._INDEXED_ATTRIBUTES)
+
+
+@pytest.mark.parametrize("content", [b"", b"not a pickle", b"\x80\x05\x95garbage"])
+def test_corrupt_cache_falls_back(songs_path, cache_dir, content):
+    SongsDatabase(songs_path)
+    (cache_path,) = (cache_dir / "indexes").glob("*.idx.pkl")
+    cache_path.write_bytes(content)
+
+    db = SongsDatabase(songs_path)
+    assert len(db.songs) == 2
+    assert db.get_songs_by_composer("נעמי שמר") == db.songs
+    # The rebuild replaced the corrupt file with a loadable cache
+    assert cache_path.read_bytes() != content
@@ -0,0 +1,55 @@
+"""Tests for the orjson / json helpers."""
+
+import importlib.util
+import json
+import sys
+
+import pytest
+
+from music_library_mcp import _json
+
+# Values for which both backends must write the same text
+VALUES = [
+    "",
+    "ירושלים של זהב",
+    'quotes " and \\ backslashes\n',
+    0,
+    -17,
+    2 ** 63 - 1,
+    0.5,
+    True,
+    False,
+    None,
+    [],
+    {},
+    [[], {}, [[]]],
+    {"name": "שיר", "composers": ["נעמי שמר"], "ids": [1, 2], "empty": [], "nested": {"a": {"b": None}}},
+]
+
+
+def load_stdlib_backend(monkeypatch):
+    """A separate copy of the helpers module that cannot import orjson."""
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    spec = importlib.util.spec_from_file_location("_json_stdlib", _json.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert module.orjson is None
+    return module
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_backends_write_the_same_text(value, monkeypatch):
+    stdlib = load_stdlib_backend(monkeypatch)
+
+    assert _json.dumps(value) == stdlib.dumps(value)
+    assert _json.dumps_indented(value) == stdlib.dumps_indented(value)
+    assert _json.dumps_indented(value) == json.dumps(value, ensure_ascii=False, indent=2)
+    assert _json.dumps_sorted(value) == stdlib.dumps_sorted(value)
+    if not _json.INDENT:
+        assert _json.dumps(value) == json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_round_trip(value):
+    assert _json.loads(_json.dumps(value)) == value
+    assert _json.loads(_json.dumps(value).encode("utf-8")) == value
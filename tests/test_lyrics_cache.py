@@ -0,0 +1,77 @@
+"""Tests for the on-disk cache of lyrics fetched by get_lyrics."""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+URL = "https://example.com/lyrics/1.txt"
+
+
+@pytest.fixture
+def downloads(server, cache_dir, monkeypatch):
+    """URLs requested from the lyrics host, which answers with "lyrics of <url>"."""
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(200, text=f"lyrics of {request.url}")
+
+    monkeypatch.setattr(server, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return requested
+
+
+def fetch(server, url=URL, version=1):
+    return asyncio.run(server._fetch_lyrics(1, url, version))
+
+
+def test_cached_after_first_fetch(server, downloads, cache_dir):
+    assert fetch(server) == f"lyrics of {URL}"
+    assert fetch(server) == f"lyrics of {URL}"
+    assert downloads == [URL]
+
+    entry = json.loads((cache_dir / "lyrics" / "1.json").read_text(encoding="utf-8"))
+    assert entry["url"] == URL
+    assert entry["version"] == 1
+    assert entry["text"] == f"lyrics of {URL}"
+
+
+def test_expired_entry_is_refetched(server, downloads, cache_dir):
+    fetch(server)
+    path = cache_dir / "lyrics" / "1.json"
+    entry = json.loads(path.read_text(encoding="utf-8"))
+    entry["fetched_at"] = time.time() - server._LYRICS_CACHE_TTL - 1
+    path.write_text(json.dumps(entry), encoding="utf-8")
+
+    fetch(server)
+    assert downloads == [URL, URL]
+
+
+def test_changed_url_or_version_is_refetched(server, downloads):
+    other_url = "https://example.com/lyrics/1-new.txt"
+    fetch(server)
+    assert fetch(server, version=2) == f"lyrics of {URL}"
+    assert fetch(server, url=other_url, version=2) == f"lyrics of {other_url}"
+    assert downloads == [URL, URL, other_url]
+
+
+@pytest.mark.parametrize("content", [b"", b"{not json", b"\xff\xfe"])
+def test_unreadable_entry_is_refetched(server, downloads, cache_dir, content):
+    path = cache_dir / "lyrics" / "1.json"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(content)
+
+    assert fetch(server) == f"lyrics of {URL}"
+    assert downloads == [URL]
+    assert json.loads(path.read_text(encoding="utf-8"))["url"] == URL
+
+
+def test_unwritable_cache_dir_is_ignored(server, downloads, cache_dir):
+    # A file where the cache directory should be makes every write fail
+    cache_dir.write_text("", encoding="utf-8")
+
+    assert fetch(server) == f"lyrics of {URL}"
+    assert fetch(server) == f"lyrics of {URL}"
+    assert downloads == [URL, URL]
@@ -0,0 +1,71 @@
+"""Tests for get_lyrics downloads shared between concurrent calls."""
+
+import asyncio
+import gc
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+URL = "https://example.com/lyrics/1.txt"
+
+
+@pytest.fixture
+def lyrics_host(server, cache_dir, monkeypatch):
+    """A lyrics host that holds every response until its release event is set."""
+    host = SimpleNamespace(requested=[], status=200, release=None)
+
+    async def handler(request):
+        host.requested.append(str(request.url))
+        await host.release.wait()
+        return httpx.Response(host.status, text="lyrics")
+
+    monkeypatch.setattr(server, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return host
+
+
+async def wait_for_request(host):
+    for _ in range(500):
+        if host.requested:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("the lyrics were never requested")
+
+
+def test_cancelled_caller_leaves_shared_download(server, lyrics_host):
+    async def scenario():
+        lyrics_host.release = asyncio.Event()
+        first = asyncio.create_task(server._fetch_lyrics(1, URL, 1))
+        second = asyncio.create_task(server._fetch_lyrics(1, URL, 1))
+        await wait_for_request(lyrics_host)
+
+        first.cancel()
+        lyrics_host.release.set()
+        assert await second == "lyrics"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(scenario())
+    assert lyrics_host.requested == [URL]
+    assert not server._lyrics_inflight
+
+
+def test_unawaited_failure_is_retrieved(server, lyrics_host):
+    unhandled = []
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+        lyrics_host.release = asyncio.Event()
+        lyrics_host.status = 500
+        caller = asyncio.create_task(server._fetch_lyrics(1, URL, 1))
+        await wait_for_request(lyrics_host)
+
+        caller.cancel()
+        lyrics_host.release.set()
+        while server._lyrics_inflight:
+            await asyncio.sleep(0.01)
+        # A task whose exception was never retrieved reports it when collected
+        gc.collect()
+
+    asyncio.run(scenario())
+    assert unhandled == []
@@ -0,0 +1,57 @@
+"""Tests comparing search_songs with a plain substring scan."""
+
+import pytest
+
+
+def scan(library, query, artist=None):
+    """The songs search_songs must return: a case-insensitive substring match."""
+    query_lower = query.lower()
+    return [
+        song for song in library.songs
+        if (query_lower in (song.get('name') or '').lower()
+            or query_lower in (song.get('singer') or '').lower())
+        and (artist is None or (song.get('singer') or '').strip().lower() == artist.strip().lower())
+    ]
+
+
+def substrings(library, max_length=8):
+    """Every substring of every name and singer, in original and lowercase."""
+    found = set()
+    for song in library.songs:
+        for text in (song.get('name') or '', song.get('singer') or ''):
+            for start in range(len(text)):
+                for end in range(start + 1, min(start + max_length, len(text)) + 1):
+                    found.add(text[start:end])
+                    found.add(text[start:end].upper())
+    return sorted(found)
+
+
+QUERIES = [
+    # Shorter than a trigram
+    "a", "A", "ab", "ים", "ה",
+    # Crossing word boundaries and repeated spaces
+    "it b", "t It Be", "של זה", "  name  ", "e  ", "דו ד",
+    # Case-folding, including characters whose lowercase changes length or form
+    "YESTERDAY", "the BEATLES", "istanbul", "İSTANBUL", "i̇stanbul", "STRASSE", "straße",
+    "σας", "ΣΑΣ", "ας α",
+    # Hebrew with and without niqqud
+    "ארץ ישראל", "אֶרֶץ", "יִשְׂרָאֵל יָפָה", "לֵילוֹת", "לילות",
+    # Mixed scripts and no match
+    "sea ים", "Love Sea", "zzz", "אאא",
+]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_query_matches_scan(library, query):
+    assert library.search_songs(query=query) == scan(library, query)
+
+
+def test_every_substring_matches_scan(library):
+    for query in substrings(library):
+        assert library.search_songs(query=query) == scan(library, query), query
+
+
+@pytest.mark.parametrize("query", ["the", "Cohen", "ארצי", "ab", "zzz"])
+@pytest.mark.parametrize("artist", ["The Beatles", "leonard cohen", "שלמה ארצי", "ABBA"])
+def test_query_with_artist_matches_scan(library, query, artist):
+    assert library.search_songs(query=query, artist=artist) == scan(library, query, artist)
@@ -1,23 +1,13 @@
 """Quick test script to verify the server loads correctly."""
 
-from music_library_mcp.database import SongsDatabase
-from pathlib import Path
+import pytest
 
-def test_database():
+
+def test_database(db):
     """Test that the database loads and indexes correctly."""
     print("Testing Music Library MCP Server...")
     print("-" * 50)
 
-    # Load database
-    db_path = Path(__file__).parent / "songs" / "songs.json"
-    print(f"\nLoading database from: {db_path}")
-
-    if not db_path.exists():
-        print(f"ERROR: Database file not found at {db_path}")
-        return
-
-    db = SongsDatabase(db_path)
-
     # Get stats
     stats = db.get_stats()
     print(f"\nDatabase Stats:")
@@ -56,4 +46,4 @@ def test_database():
     print("  python -m music_library_mcp.server")
 
 if __name__ == "__main__":
-    test_database()
+    pytest.main([__file__, "-s"])
@@ -0,0 +1,75 @@
+"""Golden-output tests for the songs file writer used by the scripts."""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from music_library_mcp._json import write_songs_json
+
+FORMATTED_PATH = Path(__file__).parent / "fixtures" / "songs_formatted.json"
+
+DOCUMENT = {
+    "version": "2.1",
+    "title": "שירים",
+    "categories": [{"id": "1", "name": "עברית"}, {}],
+    "songs": [
+        {
+            "id": 1,
+            "name": "ירושלים של זהב",
+            "singer": "שולי נתן",
+            "composers": ["נעמי שמר"],
+            "lyricists": ["נעמי שמר", 'Say "hi"\\'],
+            "translators": [],
+            "playback": {"youTubeVideoId": None, "starts": [0, 12.5]},
+            "isPrivate": False,
+            "categoryIds": ["1", "2"],
+            "lyrics": {},
+            "tags": [["a", "b"], [], [{}]],
+            "dateCreated": "2024-01-01T00:00:00Z",
+        },
+        {
+            "id": 2,
+            "name": "Tab\there\nnewline × ✓",
+            "composers": ["שלמה ארצי"],
+            "categoryIds": [3, 4],
+            "notes": ["one", "two"],
+        },
+        {},
+    ],
+    "empty": [],
+    "meta": {},
+}
+
+
+def write(data):
+    f = io.StringIO()
+    write_songs_json(data, f)
+    return f.getvalue()
+
+
+def test_golden_output():
+    assert write(DOCUMENT) == FORMATTED_PATH.read_text(encoding="utf-8")
+
+
+def test_output_parses_back():
+    assert json.loads(write(DOCUMENT)) == DOCUMENT
+
+
+@pytest.mark.parametrize("data, expected", [
+    ({}, "{}"),
+    ({"songs": []}, '{\n\t"songs": []\n}'),
+    ({"songs": [{}]}, '{\n\t"songs": [\n\t\t{}\n\t]\n}'),
+])
+def test_empty_documents(data, expected):
+    assert write(data) == expected
+
+
+def test_matches_json_dumps_without_one_liner_arrays():
+    """Apart from the one-liner arrays, the layout is json.dumps with tabs."""
+    data = {
+        "songs": [{"id": 1, "name": "שיר", "notes": ["a", ["b", []]], "extra": {"x": [{}]}}],
+        "other": [1, 2.5, None, True, "ü"],
+    }
+    assert write(data) == json.dumps(data, ensure_ascii=False, indent="\t")
@@ -0,0 +1,22 @@
+"""Tests for get_stats on the committed test library."""
+
+import pytest
+
+from conftest import LIBRARY_PATH
+from music_library_mcp.database import SongsDatabase
+
+
+@pytest.fixture
+def fresh_library():
+    return SongsDatabase(LIBRARY_PATH, index_cache=False)
+
+
+def test_stats_do_not_build_collaborations(fresh_library):
+    fresh_library.get_stats()
+    assert not fresh_library._collab_built
+
+
+def test_collaboration_count_matches_cache(fresh_library):
+    total = fresh_library.get_stats()["total_collaborations"]
+    assert total == len(fresh_library.get_all_collaborations())
+    assert total == sum(len(collabs) for collabs in fresh_library.collaborations_cache.values())